@@ -0,0 +1,104 @@
+import csv
+import json
+import sys
+from collections import OrderedDict
+
+from degrees import load_snapshot, person_id_for_name
+from graph import SearchTree
+
+# Number of search trees kept around for sources that may come back
+TREE_CACHE_SIZE = 8
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python batch.py [directory] [queries]")
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    queries = sys.argv[2] if len(sys.argv) == 3 else "-"
+
+    graph = load_snapshot(directory)
+
+    if queries == "-":
+        answer_queries(graph, sys.stdin, sys.stdout)
+    else:
+        with open(queries, encoding="utf-8") as f:
+            answer_queries(graph, f, sys.stdout)
+
+
+def answer_queries(graph, lines, out):
+    """
+    Answers every "source,target" pair of names read from lines
+    and writes one JSON object per pair to out, as soon as it is known.
+
+    Queries sharing a source person continue the same search tree.
+    """
+    trees = OrderedDict()
+
+    for row in csv.reader(lines):
+        if not row or not "".join(row).strip():
+            continue
+        if len(row) != 2:
+            write_result(out, {"query": row, "error": "Expected 2 names."})
+            continue
+
+        source_name, target_name = (name.strip() for name in row)
+        result = {"source": source_name, "target": target_name}
+
+        source = resolve_name(graph, source_name, result)
+        if source is not None:
+            target = resolve_name(graph, target_name, result)
+        if source is None or target is None:
+            write_result(out, result)
+            continue
+
+        # reuse the tree of a recent query with the same source
+        tree = trees.pop(source, None)
+        if tree is None:
+            tree = SearchTree(graph, source)
+        trees[source] = tree
+        if len(trees) > TREE_CACHE_SIZE:
+            trees.popitem(last=False)
+
+        record_path(result, tree.path_to(target))
+        write_result(out, result)
+
+
+def resolve_name(graph, name, result):
+    """
+    Returns the person_id for a name without prompting.
+    Records an error in result if the name is unknown or ambiguous.
+    """
+    person_id = person_id_for_name(name, graph, interactive=False)
+    if person_id is None:
+        candidates = graph.names.get(name.lower(), [])
+        if candidates:
+            result["error"] = f"Ambiguous name '{name}'."
+            result["candidates"] = candidates
+        else:
+            result["error"] = f"Person '{name}' not found."
+    return person_id
+
+
+def record_path(result, path):
+    """
+    Records the degrees and (movie_id, person_id) path of a query
+    in result, both None if the people are not connected.
+    """
+    if path is None:
+        result["degrees"] = None
+        result["path"] = None
+    else:
+        result["degrees"] = len(path)
+        result["path"] = [
+            {"movie_id": movie_id, "person_id": person_id}
+            for movie_id, person_id in path
+        ]
+
+
+def write_result(out, result):
+    out.write(json.dumps(result) + "\n")
+    out.flush()
+
+
+if __name__ == "__main__":
+    main()
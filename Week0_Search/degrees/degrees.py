@@ -1,6 +1,11 @@
 import csv
 import sys
+from array import array
 
+from graph import Graph
+from landmarks import load_landmarks
+from loader import load_graph as stream_graph
+from snapshot import read_snapshot, write_snapshot
 from util import Node, StackFrontier, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
@@ -12,6 +17,9 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Maps person_ids to the id of their connected component
+components = {}
+
 
 def load_data(directory):
     """
@@ -51,25 +59,110 @@ def load_data(directory):
             except KeyError:
                 pass
 
+    label_components()
+
+
+def label_components():
+    """
+    Labels every person with the id of their connected component,
+    the position of its first person in people, using union-find
+    over the stars of each movie.
+    """
+    index = dict(zip(people, range(len(people))))
+    parent = array("i", range(len(people)))
+
+    # everyone who starred in the same movie is in the same component,
+    # the larger root always goes under the smaller one
+    for movie in movies.values():
+        first = None
+        for person_id in movie["stars"]:
+            root = index[person_id]
+            # path halving keeps the trees flat
+            while parent[root] != root:
+                parent[root] = parent[parent[root]]
+                root = parent[root]
+            if first is None:
+                first = root
+            elif root < first:
+                parent[first] = root
+                first = root
+            elif root > first:
+                parent[root] = first
+
+    # parents come before their children, one pass labels everyone
+    for i in range(len(parent)):
+        parent[i] = parent[parent[i]]
+    components.update(zip(people, parent))
+
+
+def load_graph():
+    """
+    Builds the compact co-star graph from the loaded data and empties
+    the dictionaries it replaces, the graph keeps names and titles.
+    """
+    labels = array("i", [components[person_id] for person_id in people])
+    graph = Graph.from_data(people, movies, labels)
+    names.clear()
+    people.clear()
+    movies.clear()
+    components.clear()
+    return graph
+
+
+def load_snapshot(directory):
+    """
+    Returns the compact co-star graph from the snapshot of the directory,
+    building the snapshot from the CSV files first if it is missing
+    or out of date.
+    """
+    graph = read_snapshot(directory)
+    if graph is None:
+        load_data(directory)
+        write_snapshot(directory, load_graph())
+        graph = read_snapshot(directory)
+    return graph
+
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    flags = {arg for arg in sys.argv[1:] if arg.startswith("--")}
+    modes = {"--bidirectional", "--compact", "--snapshot", "--landmarks",
+             "--stream"}
+    if len(args) > 1 or len(flags) > 1 or not flags.issubset(modes):
+        sys.exit("Usage: python degrees.py [directory] [--bidirectional"
+                 " | --compact | --snapshot | --landmarks | --stream]")
+    directory = args[0] if len(args) == 1 else "large"
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    graph = None
+    if "--snapshot" in flags:
+        graph = load_snapshot(directory)
+    elif "--landmarks" in flags:
+        graph = load_snapshot(directory)
+        index = load_landmarks(directory, graph)
+    elif "--stream" in flags:
+        graph = stream_graph(directory)
+    else:
+        load_data(directory)
+        if "--compact" in flags:
+            graph = load_graph()
     print("Data loaded.")
 
-    source = person_id_for_name(input("Name: "))
+    source = person_id_for_name(input("Name: "), graph)
     if source is None:
         sys.exit("Person not found.")
-    target = person_id_for_name(input("Name: "))
+    target = person_id_for_name(input("Name: "), graph)
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if "--landmarks" in flags:
+        path = index.shortest_path(graph, source, target)
+    elif graph is not None:
+        path = graph.shortest_path(source, target)
+    else:
+        path = shortest_path(source, target,
+                             bidirectional="--bidirectional" in flags)
 
     if path is None:
         print("Not connected.")
@@ -77,21 +170,37 @@ def main():
         degrees = len(path)
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
+        if graph is not None:
+            graph.prefetch([person_id for _, person_id in path],
+                           [movie_id for movie_id, _ in path[1:]])
+        person = people.get if graph is None else graph.person
+        movie = movies.get if graph is None else graph.movie
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
-            print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+            person1 = person(path[i][1])["name"]
+            person2 = person(path[i + 1][1])["name"]
+            title = movie(path[i + 1][0])["title"]
+            print(f"{i + 1}: {person1} and {person2} starred in {title}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, bidirectional=False):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
+
+    If bidirectional is True, search from both the source and the target
+    and stop when the two searches meet.
     """
 
+    # people in different connected components are never connected,
+    # answer without searching
+    if components.get(source) != components.get(target):
+        return None
+
+    if bidirectional:
+        return bidirectional_search(source, target)
+
     # state is a person 
     # action is a movie the person starred in 
     # our target is the person we're trying to connect to 
@@ -139,18 +248,120 @@ def shortest_path(source, target):
                 frontier.add(new_person)
 
 
-def person_id_for_name(name):
+def bidirectional_search(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, expanding breadth-first
+    from both ends one level at a time.
+
+    If no possible path, returns None.
+    """
+
+    if source == target:
+        return []
+
+    # parents maps every reached person to the (movie_id, person_id) pair
+    # that leads one step back towards the side the search started from
+    forward_parents = {source: None}
+    backward_parents = {target: None}
+    forward_level = [source]
+    backward_level = [target]
+
+    while forward_level and backward_level:
+
+        # always expand the smaller level, it reaches fewer new people
+        if len(forward_level) <= len(backward_level):
+            forward_level, meeting = expand_level(
+                forward_level, forward_parents, backward_parents)
+            if meeting is not None:
+                return join_paths(meeting, forward_parents, backward_parents)
+        else:
+            backward_level, meeting = expand_level(
+                backward_level, backward_parents, forward_parents)
+            if meeting is not None:
+                person, movie, other = meeting
+                return join_paths((other, movie, person),
+                                  forward_parents, backward_parents)
+
+    return None
+
+
+def expand_level(level, parents, other_parents):
+    """
+    Expands every person on the current level of one side of a
+    bidirectional search.
+
+    Returns the next level and the (person, movie_id, neighbor) edge
+    where this side met the other one, or None if they did not meet.
+    """
+
+    next_level = []
+
+    # every meeting found on this level connects paths of the same length
+    # so the first one found is already a shortest connection
+    for person_id in level:
+        for movie_id, neighbor_id in neighbors_for_person(person_id):
+            if neighbor_id in other_parents:
+                return next_level, (person_id, movie_id, neighbor_id)
+            if neighbor_id not in parents:
+                parents[neighbor_id] = (movie_id, person_id)
+                next_level.append(neighbor_id)
+
+    return next_level, None
+
+
+def join_paths(meeting, forward_parents, backward_parents):
+    """
+    Builds the (movie_id, person_id) path through the meeting edge,
+    going from the source side to the target side.
+    """
+
+    person_id, movie_id, neighbor_id = meeting
+
+    # walk back from the meeting point to the source
+    path = []
+    while forward_parents[person_id] is not None:
+        parent_movie, parent_id = forward_parents[person_id]
+        path.append((parent_movie, person_id))
+        person_id = parent_id
+    path.reverse()
+
+    # cross the meeting edge and walk forward to the target
+    path.append((movie_id, neighbor_id))
+    while backward_parents[neighbor_id] is not None:
+        parent_movie, parent_id = backward_parents[neighbor_id]
+        path.append((parent_movie, parent_id))
+        neighbor_id = parent_id
+
+    return path
+
+
+def person_id_for_name(name, graph=None, interactive=True):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    If a compact graph is given, look the name up in the graph
+    instead of the loaded dictionaries.
+
+    If interactive is False, ambiguous names return None
+    instead of prompting for the intended person.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    if graph is None:
+        person_ids = list(names.get(name.lower(), set()))
+    else:
+        person_ids = graph.names.get(name.lower(), [])
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
+        if not interactive:
+            return None
         print(f"Which '{name}'?")
         for person_id in person_ids:
-            person = people[person_id]
+            if graph is None:
+                person = people[person_id]
+            else:
+                person = graph.person(person_id)
             name = person["name"]
             birth = person["birth"]
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
@@ -0,0 +1,364 @@
+from array import array
+from functools import cached_property
+
+
+class Graph():
+    """
+    Compact co-star graph.
+
+    People and movies are mapped to dense integer indexes and the
+    co-stars of every person are stored in CSR style arrays:
+    the co-stars of person i are neighbors[offsets[i]:offsets[i + 1]]
+    and movies[k] is the movie shared with neighbors[k].
+    """
+
+    def __init__(self, person_ids, movie_ids, offsets, neighbors, movies,
+                 metadata=None, components=None, orders=None):
+        # Maps person indexes to IMDb person_ids
+        self.person_ids = person_ids
+
+        # Maps movie indexes to IMDb movie_ids
+        self.movie_ids = movie_ids
+
+        # CSR adjacency arrays
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.movies = movies
+
+        # Display data aligned with the indexes:
+        # names, births, titles and years lists
+        self.metadata = metadata
+
+        # Component labels read back from a snapshot, labelled on demand
+        # otherwise
+        if components is not None:
+            self.components = components
+
+        # Sort orders read back from a snapshot, sorted on demand otherwise
+        if orders is not None:
+            self.orders = orders
+
+    @cached_property
+    def orders(self):
+        """
+        Maps "person_ids", "movie_ids" and "names" to the indexes
+        of that table sorted by id, or by lowercase name.
+        """
+        return {
+            "person_ids": sort_order(self.person_ids),
+            "movie_ids": sort_order(self.movie_ids),
+            "names": sort_order(self.metadata["names"], str.lower),
+        }
+
+    @cached_property
+    def person_index(self):
+        """Maps IMDb person_ids to person indexes."""
+        return SortedIndex(self.person_ids, self.orders["person_ids"])
+
+    @cached_property
+    def movie_index(self):
+        """Maps IMDb movie_ids to movie indexes."""
+        return SortedIndex(self.movie_ids, self.orders["movie_ids"])
+
+    @cached_property
+    def components(self):
+        """
+        Maps person indexes to the id of their connected component,
+        the smallest person index in it.
+        """
+        offsets = self.offsets
+        neighbors = self.neighbors
+        components = array("i", [-1]) * len(self)
+
+        # depth-first labelling of every component not labelled yet
+        for root in range(len(self)):
+            if components[root] != -1:
+                continue
+            components[root] = root
+            stack = [root]
+            while stack:
+                person = stack.pop()
+                for edge in range(offsets[person], offsets[person + 1]):
+                    neighbor = neighbors[edge]
+                    if components[neighbor] == -1:
+                        components[neighbor] = root
+                        stack.append(neighbor)
+        return components
+
+    @cached_property
+    def names(self):
+        """Maps lowercase names to a list of corresponding person_ids."""
+        return NameIndex(self.metadata["names"], self.orders["names"],
+                         self.person_ids)
+
+    @classmethod
+    def from_data(cls, people, movies, components=None):
+        """
+        Builds the graph from the people and movies dictionaries
+        filled by degrees.load_data, and the component labels
+        of the people in that order if they are known already.
+        """
+        person_ids = list(people)
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        movie_ids = list(movies)
+        movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+
+        offsets = array("i", [0])
+        neighbors = array("i")
+        shared_movies = array("i")
+
+        for person_id in person_ids:
+            # keep one shared movie per co-star, that is all a path needs
+            costars = {}
+            for movie_id in people[person_id]["movies"]:
+                for costar_id in movies[movie_id]["stars"]:
+                    if costar_id != person_id and costar_id not in costars:
+                        costars[costar_id] = movie_id
+            for costar_id, movie_id in costars.items():
+                neighbors.append(person_index[costar_id])
+                shared_movies.append(movie_index[movie_id])
+            offsets.append(len(neighbors))
+
+        metadata = {
+            "names": StringTable.from_strings(
+                people[person_id]["name"] for person_id in person_ids),
+            "births": StringTable.from_strings(
+                people[person_id]["birth"] for person_id in person_ids),
+            "titles": StringTable.from_strings(
+                movies[movie_id]["title"] for movie_id in movie_ids),
+            "years": StringTable.from_strings(
+                movies[movie_id]["year"] for movie_id in movie_ids),
+        }
+
+        return cls(StringTable.from_strings(person_ids),
+                   StringTable.from_strings(movie_ids),
+                   offsets, neighbors, shared_movies, metadata, components)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def prefetch(self, person_ids, movie_ids):
+        """
+        Makes sure the display data of the given people and movies
+        is at hand, it always is for a graph holding its metadata.
+        """
+
+    def person(self, person_id):
+        """Returns a dictionary of: name, birth for a person_id."""
+        index = self.person_index[person_id]
+        return {
+            "name": self.metadata["names"][index],
+            "birth": self.metadata["births"][index],
+        }
+
+    def movie(self, movie_id):
+        """Returns a dictionary of: title, year for a movie_id."""
+        index = self.movie_index[movie_id]
+        return {
+            "title": self.metadata["titles"][index],
+            "year": self.metadata["years"][index],
+        }
+
+    def neighbors_for(self, index):
+        """
+        Returns (movie_index, person_index) pairs for people
+        who starred with the person at index.
+        """
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return zip(self.movies[start:end], self.neighbors[start:end])
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target person_ids.
+
+        If no possible path, returns None.
+        """
+        return SearchTree(self, source).path_to(target)
+
+    def build_path(self, person, parent, parent_edge):
+        """
+        Follows the parent arrays from person back to the search root,
+        the person that is its own parent, and returns the
+        (movie_id, person_id) path from the root.
+        """
+        path = []
+        while parent[person] != person:
+            movie = self.movies[parent_edge[person]]
+            path.append((self.movie_ids[movie], self.person_ids[person]))
+            person = parent[person]
+        path.reverse()
+        return path
+
+
+class StringTable():
+    """
+    Strings packed one after the other into a single UTF-8 buffer,
+    string i being data[offsets[i]:offsets[i + 1]].
+
+    Only the strings that are asked for are decoded, so a table
+    holds no Python object per string and can be memory-mapped.
+    """
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    @classmethod
+    def from_strings(cls, strings):
+        """Packs the strings into a new table."""
+        offsets = array("i", [0])
+        data = bytearray()
+        for string in strings:
+            data += string.encode("utf-8")
+            offsets.append(len(data))
+        return cls(offsets, data)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def sort_order(table, key=str):
+    """
+    Returns the indexes of the strings of table, sorted by key(string).
+    """
+    return array("i", sorted(range(len(table)), key=lambda i: key(table[i])))
+
+
+class SortedIndex():
+    """
+    Maps strings of a table to their indexes by binary search over
+    the indexes sorted by key(string), in place of a dictionary,
+    so nothing has to be built before the first lookup.
+    """
+
+    def __init__(self, table, order, key=str):
+        self.table = table
+        self.order = order
+        self.key = key
+
+    def indexes(self, value):
+        """Returns the indexes of every string whose key is value."""
+        table, order, key = self.table, self.order, self.key
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            if key(table[order[middle]]) < value:
+                low = middle + 1
+            else:
+                high = middle
+
+        indexes = []
+        while low < len(order) and key(table[order[low]]) == value:
+            indexes.append(order[low])
+            low += 1
+        return indexes
+
+    def get(self, value, default=None):
+        indexes = self.indexes(value)
+        return indexes[0] if indexes else default
+
+    def __getitem__(self, value):
+        index = self.get(value)
+        if index is None:
+            raise KeyError(value)
+        return index
+
+    def __contains__(self, value):
+        return self.get(value) is not None
+
+
+class NameIndex():
+    """
+    Maps lowercase names to the list of corresponding person_ids,
+    looking them up in the sorted order of the names table.
+    """
+
+    def __init__(self, names, order, person_ids):
+        self.index = SortedIndex(names, order, str.lower)
+        self.person_ids = person_ids
+
+    def get(self, name, default=None):
+        # the sort is stable, people sharing a name come in index order
+        person_ids = [self.person_ids[i] for i in self.index.indexes(name)]
+        return person_ids if person_ids else default
+
+
+class SearchTree():
+    """
+    Breadth-First search tree rooted at one person of a Graph.
+
+    The search only expands as many levels as the targets asked so far
+    need, and later targets continue from where it stopped, so every
+    query sharing the same source reuses one tree.
+    """
+
+    def __init__(self, graph, source, source_index=None):
+        self.graph = graph
+        if source_index is None:
+            source_index = graph.person_index[source]
+        self.source = source_index
+
+        # parent[i] is the index of the person that reached i,
+        # -1 while i has not been reached yet
+        self.parent = array("i", [-1]) * len(graph)
+        self.parent_edge = array("i", [-1]) * len(graph)
+        self.parent[self.source] = self.source
+
+        # the level list plays the role of the queue frontier
+        self.level = [self.source]
+        self.depth = 0
+
+    def expand(self):
+        """
+        Expands the current level of the search.
+        Returns False if there was nothing left to expand.
+        """
+        if not self.level:
+            return False
+
+        offsets = self.graph.offsets
+        neighbors = self.graph.neighbors
+        parent = self.parent
+        parent_edge = self.parent_edge
+
+        next_level = []
+        for person in self.level:
+            for edge in range(offsets[person], offsets[person + 1]):
+                neighbor = neighbors[edge]
+                if parent[neighbor] == -1:
+                    parent[neighbor] = person
+                    parent_edge[neighbor] = edge
+                    next_level.append(neighbor)
+        self.level = next_level
+        self.depth += 1
+        return True
+
+    def path_to(self, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source of the tree to the target person_id.
+
+        If no possible path, returns None.
+        """
+        target = self.graph.person_index[target]
+
+        # people in different connected components are never connected
+        components = self.graph.components
+        if components[self.source] != components[target]:
+            return None
+
+        while self.parent[target] == -1:
+            if not self.expand():
+                return None
+
+        return self.graph.build_path(target, self.parent, self.parent_edge)
@@ -0,0 +1,241 @@
+import heapq
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from graph import SearchTree
+from snapshot import SOURCE, SOURCES, source_stamps, sources_changed
+
+# Name of the landmark index file written next to the CSV files
+LANDMARKS = "degrees.landmarks"
+
+# Bump whenever the layout below changes, older indexes are then rebuilt
+FORMAT_VERSION = 1
+
+MAGIC = b"LANDMARK"
+
+# Number of landmarks picked when building an index
+LANDMARK_COUNT = 16
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = 255
+
+# magic, format version, number of landmarks, number of people
+HEADER = struct.Struct("<8sIII")
+
+
+class LandmarkIndex():
+    """
+    Breadth-First search distances from a few high-degree people,
+    the landmarks, to every person of a Graph.
+
+    By the triangle inequality, the distance between u and t is at least
+    |distance(L, u) - distance(L, t)| for every landmark L, and people
+    reached by a landmark are not connected to people it cannot reach.
+    """
+
+    def __init__(self, landmarks, distances):
+        # person indexes of the landmarks
+        self.landmarks = landmarks
+
+        # distances[k][i] is the distance from landmark k to person i
+        self.distances = distances
+
+    @classmethod
+    def build(cls, graph, count=LANDMARK_COUNT):
+        """
+        Picks the count people with the most co-stars as landmarks
+        and runs a full Breadth-First search from each of them.
+        """
+        offsets = graph.offsets
+        landmarks = sorted(
+            range(len(graph)),
+            key=lambda i: offsets[i + 1] - offsets[i],
+            reverse=True
+        )[:count]
+
+        distances = []
+        for landmark in landmarks:
+            tree = SearchTree(graph, graph.person_ids[landmark])
+            distance = bytearray([UNREACHABLE]) * len(graph)
+            distance[landmark] = 0
+            while tree.expand():
+                depth = min(tree.depth, UNREACHABLE - 1)
+                for person in tree.level:
+                    distance[person] = depth
+            distances.append(distance)
+
+        return cls(array("i", landmarks), distances)
+
+    def bounds_for(self, target):
+        """
+        Returns the distances from every landmark to the target index.
+        """
+        return [distance[target] for distance in self.distances]
+
+    def lower_bound(self, person, target_bounds):
+        """
+        Returns a lower bound of the distance from person to the target
+        whose landmark distances are target_bounds,
+        None if the two people are not connected.
+        """
+        bound = 0
+        for distance, target_distance in zip(self.distances, target_bounds):
+            person_distance = distance[person]
+            if person_distance == UNREACHABLE:
+                if target_distance != UNREACHABLE:
+                    return None
+            elif target_distance == UNREACHABLE:
+                return None
+            elif abs(person_distance - target_distance) > bound:
+                bound = abs(person_distance - target_distance)
+        return bound
+
+    def shortest_path(self, graph, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target person_ids.
+
+        If no possible path, returns None.
+
+        Uses A* search with the landmark lower bound as heuristic, and
+        answers without searching when a landmark separates the two people.
+        """
+        source = graph.person_index[source]
+        target = graph.person_index[target]
+        if source == target:
+            return []
+        if graph.components[source] != graph.components[target]:
+            return None
+
+        target_bounds = self.bounds_for(target)
+        estimate = self.lower_bound(source, target_bounds)
+        if estimate is None:
+            return None
+
+        offsets = graph.offsets
+        neighbors = graph.neighbors
+
+        parent = array("i", [-1]) * len(graph)
+        parent_edge = array("i", [-1]) * len(graph)
+        parent[source] = source
+        cost = {source: 0}
+        expanded = bytearray(len(graph))
+
+        # the frontier is ordered by cost so far plus lower bound,
+        # ties broken towards people closer to the target
+        frontier = [(estimate, estimate, source)]
+        while frontier:
+            _, _, person = heapq.heappop(frontier)
+            if person == target:
+                return graph.build_path(target, parent, parent_edge)
+
+            # the lower bound is consistent, a person is final
+            # the first time it leaves the frontier
+            if expanded[person]:
+                continue
+            expanded[person] = 1
+
+            person_cost = cost[person] + 1
+            for edge in range(offsets[person], offsets[person + 1]):
+                neighbor = neighbors[edge]
+                if person_cost >= cost.get(neighbor, person_cost + 1):
+                    continue
+                bound = self.lower_bound(neighbor, target_bounds)
+                if bound is None:
+                    continue
+                cost[neighbor] = person_cost
+                parent[neighbor] = person
+                parent_edge[neighbor] = edge
+                heapq.heappush(
+                    frontier, (person_cost + bound, bound, neighbor)
+                )
+
+        return None
+
+
+def load_landmarks(directory, graph):
+    """
+    Returns the landmark index of the directory,
+    building and saving it first if it is missing or out of date.
+    """
+    index = read_landmarks(directory, graph)
+    if index is None:
+        write_landmarks(directory, LandmarkIndex.build(graph))
+        index = read_landmarks(directory, graph)
+    return index
+
+
+def write_landmarks(directory, index):
+    """
+    Writes the landmark index to the landmarks file of the directory.
+    """
+    path = os.path.join(directory, LANDMARKS)
+    with open(path + ".tmp", "wb") as f:
+        people = len(index.distances[0]) if index.distances else 0
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION,
+                            len(index.landmarks), people))
+        for stamp in source_stamps(directory):
+            f.write(SOURCE.pack(*stamp))
+        f.write(struct.pack(f"<{len(index.landmarks)}i", *index.landmarks))
+        for distance in index.distances:
+            f.write(distance)
+    os.replace(path + ".tmp", path)
+
+
+def read_landmarks(directory, graph):
+    """
+    Memory-maps the landmark index of the directory.
+
+    Returns None if there is no index, if it was written by another
+    format version or for other source CSV files than the graph's.
+    """
+    path = os.path.join(directory, LANDMARKS)
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            return None
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(data)
+    magic, version, count, people = HEADER.unpack_from(view)
+    if magic != MAGIC or version != FORMAT_VERSION or people != len(graph):
+        return None
+
+    offset = HEADER.size
+    if sources_changed(directory, view, offset):
+        return None
+    offset += SOURCE.size * len(SOURCES)
+
+    landmarks = array("i", struct.unpack_from(f"<{count}i", view, offset))
+    offset += 4 * count
+
+    distances = []
+    for _ in range(count):
+        distances.append(view[offset:offset + people])
+        offset += people
+    return LandmarkIndex(landmarks, distances)
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python landmarks.py directory [count]")
+    directory = sys.argv[1]
+    count = int(sys.argv[2]) if len(sys.argv) == 3 else LANDMARK_COUNT
+
+    from degrees import load_snapshot
+
+    print("Loading data...")
+    graph = load_snapshot(directory)
+    print(f"Building index for {count} landmarks...")
+    write_landmarks(directory, LandmarkIndex.build(graph, count))
+    print(f"Landmarks written to {os.path.join(directory, LANDMARKS)}.")
+
+
+if __name__ == "__main__":
+    main()
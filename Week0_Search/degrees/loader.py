@@ -0,0 +1,183 @@
+import csv
+import os
+from array import array
+from itertools import islice
+
+from graph import Graph
+
+# Number of CSV rows read and converted at a time
+CHUNK_SIZE = 65536
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    """
+    Yields the rows of a CSV file, header excluded,
+    as lists of at most chunk_size rows.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        while chunk := list(islice(reader, chunk_size)):
+            yield chunk
+
+
+def intern_ids(path, chunk_size=CHUNK_SIZE):
+    """
+    Returns the ids of the first column of a CSV file and a dictionary
+    mapping each of them to its dense integer index.
+    """
+    ids = []
+    index = {}
+    for chunk in read_chunks(path, chunk_size):
+        for row in chunk:
+            if row and row[0] not in index:
+                index[row[0]] = len(ids)
+                ids.append(row[0])
+    return ids, index
+
+
+def load_graph(directory, chunk_size=CHUNK_SIZE):
+    """
+    Streams the CSV files of the directory into a compact co-star graph.
+
+    Only ids are kept in memory, names, births, titles and years
+    are read from the CSV files when they are asked for.
+    """
+    person_ids, person_index = intern_ids(
+        os.path.join(directory, "people.csv"), chunk_size)
+    movie_ids, movie_index = intern_ids(
+        os.path.join(directory, "movies.csv"), chunk_size)
+
+    # stars as two parallel integer arrays, rows naming an unknown
+    # person or movie are skipped like load_data does
+    star_people = array("i")
+    star_movies = array("i")
+    for chunk in read_chunks(os.path.join(directory, "stars.csv"),
+                             chunk_size):
+        for row in chunk:
+            person = person_index.get(row[0]) if len(row) == 2 else None
+            movie = movie_index.get(row[1]) if len(row) == 2 else None
+            if person is not None and movie is not None:
+                star_people.append(person)
+                star_movies.append(movie)
+
+    # group the stars by person and by movie with a counting sort
+    person_movies_offsets, person_movies = group(
+        star_people, star_movies, len(person_ids))
+    movie_people_offsets, movie_people = group(
+        star_movies, star_people, len(movie_ids))
+    del star_people, star_movies
+
+    offsets = array("i", [0])
+    neighbors = array("i")
+    shared_movies = array("i")
+    for person in range(len(person_ids)):
+        # keep one shared movie per co-star, that is all a path needs
+        costars = {}
+        for k in range(person_movies_offsets[person],
+                       person_movies_offsets[person + 1]):
+            movie = person_movies[k]
+            for j in range(movie_people_offsets[movie],
+                           movie_people_offsets[movie + 1]):
+                costar = movie_people[j]
+                if costar != person and costar not in costars:
+                    costars[costar] = movie
+        neighbors.extend(costars)
+        shared_movies.extend(costars.values())
+        offsets.append(len(neighbors))
+
+    graph = StreamedGraph(directory, person_ids, movie_ids,
+                          offsets, neighbors, shared_movies)
+    graph.person_index = person_index
+    graph.movie_index = movie_index
+    return graph
+
+
+def group(keys, values, count):
+    """
+    Groups values by their key, keys being integers below count.
+    Returns CSR offsets and the grouped values.
+    """
+    offsets = array("i", [0]) * (count + 1)
+    for key in keys:
+        offsets[key + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+
+    grouped = array("i", [0]) * len(values)
+    position = array("i", offsets[:-1])
+    for key, value in zip(keys, values):
+        grouped[position[key]] = value
+        position[key] += 1
+    return offsets, grouped
+
+
+class StreamedGraph(Graph):
+    """
+    Compact co-star graph whose display data stays on disk.
+
+    Names, births, titles and years are read from the CSV files
+    for the people and movies that are asked for, and cached.
+    """
+
+    def __init__(self, directory, *args):
+        super().__init__(*args)
+        self.directory = directory
+        # display data read so far, by person_id and movie_id
+        self.person_data = {}
+        self.movie_data = {}
+        self.names = NameLookup(self)
+
+    def prefetch(self, person_ids, movie_ids):
+        """
+        Reads the display data of all the given people and movies,
+        one pass over each CSV file for everything not cached yet.
+        """
+        missing = set(person_ids) - self.person_data.keys()
+        if missing:
+            path = os.path.join(self.directory, "people.csv")
+            for chunk in read_chunks(path):
+                for row in chunk:
+                    if len(row) == 3 and row[0] in missing:
+                        self.person_data[row[0]] = {"name": row[1],
+                                                    "birth": row[2]}
+
+        missing = set(movie_ids) - self.movie_data.keys()
+        if missing:
+            path = os.path.join(self.directory, "movies.csv")
+            for chunk in read_chunks(path):
+                for row in chunk:
+                    if len(row) == 3 and row[0] in missing:
+                        self.movie_data[row[0]] = {"title": row[1],
+                                                   "year": row[2]}
+
+    def person(self, person_id):
+        if person_id not in self.person_data:
+            self.prefetch([person_id], [])
+        return self.person_data[person_id]
+
+    def movie(self, movie_id):
+        if movie_id not in self.movie_data:
+            self.prefetch([], [movie_id])
+        return self.movie_data[movie_id]
+
+
+class NameLookup():
+    """
+    Finds the person_ids for a name with one pass over people.csv,
+    in place of the in-memory name index of a Graph.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def get(self, name, default=None):
+        person_ids = []
+        path = os.path.join(self.graph.directory, "people.csv")
+        for chunk in read_chunks(path):
+            for row in chunk:
+                if len(row) == 3 and row[1].lower() == name:
+                    person_ids.append(row[0])
+                    self.graph.person_data[row[0]] = {"name": row[1],
+                                                      "birth": row[2]}
+        return person_ids if person_ids else default
@@ -0,0 +1,131 @@
+import csv
+import os
+import sys
+from collections import Counter
+from multiprocessing import Pool
+
+from degrees import load_snapshot, person_id_for_name
+from graph import Graph, SearchTree
+from snapshot import read_arrays
+
+# Searches stop after this many degrees unless told otherwise
+MAX_DEPTH = 6
+
+# Graph of the worker process, only the offsets, neighbors and
+# components arrays memory-mapped from the snapshot file, so every
+# worker shares the same pages and no worker decodes ids or names
+graph = None
+
+# Person indexes every worker measures the distance to,
+# and how far it looks
+targets = []
+max_depth = MAX_DEPTH
+
+
+def main():
+    if len(sys.argv) not in [4, 5, 6]:
+        sys.exit("Usage: python separation.py directory names output "
+                 "[max_depth] [processes]")
+    directory, names_file, output = sys.argv[1:4]
+    max_depth = int(sys.argv[4]) if len(sys.argv) >= 5 else MAX_DEPTH
+    processes = int(sys.argv[5]) if len(sys.argv) == 6 else os.cpu_count()
+
+    # Make sure an up to date snapshot exists before the workers map it
+    print("Loading data...")
+    full_graph = load_snapshot(directory)
+    people = resolve_people(full_graph, names_file)
+    print(f"Computing separation for {len(people)} people...")
+
+    # the workers only know people by index
+    indexes = [full_graph.person_index[person_id] for _, person_id in people]
+    del full_graph
+
+    with Pool(processes, initializer=init_worker,
+              initargs=(directory, indexes, max_depth)) as pool:
+        matrix = pool.map(search_distances, indexes)
+
+    with open(output, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([""] + [name for name, _ in people])
+        for (name, _), row in zip(people, matrix):
+            writer.writerow([name] + ["" if d is None else d for d in row])
+    print(f"Distance matrix written to {output}.")
+
+    histogram = degrees_histogram(matrix)
+    for degrees in sorted(histogram, key=lambda d: (d is None, d)):
+        label = f"> {max_depth}" if degrees is None else degrees
+        print(f"{label} degrees: {histogram[degrees]} pairs")
+
+
+def resolve_people(graph, names_file):
+    """
+    Returns (name, person_id) pairs for every name in names_file,
+    one name per line. Unknown and ambiguous names are skipped.
+    """
+    people = []
+    with open(names_file, encoding="utf-8") as f:
+        for line in f:
+            name = line.strip()
+            if not name:
+                continue
+            person_id = person_id_for_name(name, graph, interactive=False)
+            if person_id is None:
+                print(f"Skipping '{name}': not found or ambiguous.",
+                      file=sys.stderr)
+            else:
+                people.append((name, person_id))
+    return people
+
+
+def init_worker(directory, indexes, depth):
+    global graph, targets, max_depth
+    arrays = read_arrays(directory)
+    graph = Graph(None, None, arrays["offsets"], arrays["neighbors"], None,
+                  components=arrays["components"])
+    targets = indexes
+    max_depth = depth
+
+
+def search_distances(source):
+    """
+    Runs one Breadth-First search from the source index, at most
+    max_depth levels deep, and returns its distance to each of the
+    targets, None for targets further away or not connected.
+    """
+    tree = SearchTree(graph, None, source)
+    indexes = targets
+    components = graph.components
+
+    # targets in another component are never reached
+    distances = [None] * len(targets)
+    remaining = set()
+    for i, index in enumerate(indexes):
+        if index == source:
+            distances[i] = 0
+        elif components[index] == components[source]:
+            remaining.add(i)
+
+    # record the level at which each target is first reached
+    while remaining and tree.depth < max_depth and tree.expand():
+        for i in list(remaining):
+            if tree.parent[indexes[i]] != -1:
+                distances[i] = tree.depth
+                remaining.remove(i)
+
+    return distances
+
+
+def degrees_histogram(matrix):
+    """
+    Counts the pairs of different people at each degree of separation,
+    None counting the pairs further apart than the search went.
+    """
+    histogram = Counter()
+    for i, row in enumerate(matrix):
+        for j in range(i + 1, len(row)):
+            histogram[row[j]] += 1
+    return histogram
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import os
+import signal
+import socket
+import stat
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from batch import record_path, resolve_name
+from degrees import load_snapshot
+
+# Number of (source, target) results kept in memory
+CACHE_SIZE = 4096
+
+# Number of searches that may run at the same time
+WORKERS = 4
+
+# Loaded once when the server starts
+graph = None
+executor = None
+shortest_path = None
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python server.py [directory] [socket]")
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    path = sys.argv[2] if len(sys.argv) == 3 else "degrees.sock"
+
+    global graph, executor, shortest_path
+    print("Loading data...")
+    graph = load_snapshot(directory)
+    executor = ThreadPoolExecutor(WORKERS)
+    shortest_path = lru_cache(maxsize=CACHE_SIZE)(graph.shortest_path)
+    print("Data loaded.")
+
+    try:
+        asyncio.run(serve(path))
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def stale_socket(path):
+    """
+    Returns True if path is a Unix socket that no server listens on,
+    left behind by a server that did not shut down cleanly.
+    """
+    if not stat.S_ISSOCK(os.lstat(path).st_mode):
+        return False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            return True
+    return False
+
+
+async def serve(path):
+    """
+    Serves JSON line requests on the Unix socket at path.
+    """
+    # only replace a socket nobody answers on, never a file
+    # or the socket of a server that is still running
+    if os.path.lexists(path):
+        if not stale_socket(path):
+            sys.exit(f"{path} exists and is not a stale socket.")
+        os.remove(path)
+    server = await asyncio.start_unix_server(handle_client, path)
+    print(f"Listening on {path}.")
+
+    # stop serving cleanly when interrupted or terminated
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, server.close)
+
+    try:
+        async with server:
+            try:
+                await server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+    finally:
+        os.remove(path)
+
+
+async def handle_client(reader, writer):
+    """
+    Answers every JSON request line sent by one client,
+    one JSON response line each, until the client disconnects.
+    """
+    try:
+        while line := await reader.readline():
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError:
+                response = {"error": "Invalid JSON."}
+            else:
+                response = await answer(request)
+            writer.write(json.dumps(response).encode("utf-8") + b"\n")
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def answer(request):
+    """
+    Answers one request:
+        {"op": "lookup", "name": name}
+        {"op": "path", "source": name, "target": name}
+    """
+    if not isinstance(request, dict):
+        return {"error": "Request must be a JSON object."}
+
+    op = request.get("op")
+    if op == "lookup":
+        name = str(request.get("name", ""))
+        return {
+            "name": name,
+            "people": [
+                dict(person_id=person_id, **graph.person(person_id))
+                for person_id in graph.names.get(name.lower(), [])
+            ]
+        }
+
+    if op == "path":
+        source_name = str(request.get("source", ""))
+        target_name = str(request.get("target", ""))
+        response = {"source": source_name, "target": target_name}
+        source = resolve_name(graph, source_name, response)
+        if source is None:
+            return response
+        target = resolve_name(graph, target_name, response)
+        if target is None:
+            return response
+
+        # searches run on the thread pool so the event loop keeps
+        # answering other clients, repeated pairs come from the cache
+        loop = asyncio.get_running_loop()
+        path = await loop.run_in_executor(
+            executor, shortest_path, source, target
+        )
+        record_path(response, path)
+        return response
+
+    return {"error": f"Unknown op {op!r}."}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+
+from graph import Graph, StringTable
+
+# Name of the snapshot file written next to the CSV files
+SNAPSHOT = "degrees.snapshot"
+
+# Bump whenever the layout below changes, older snapshots are then rebuilt
+FORMAT_VERSION = 3
+
+MAGIC = b"DEGREES\0"
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+# Integer arrays and string tables are both memory-mapped, a string
+# table being two sections: its offsets and its UTF-8 data
+ARRAYS = ("offsets", "neighbors", "movies", "components",
+          "person_ids_order", "movie_ids_order", "names_order")
+STRINGS = ("person_ids", "movie_ids", "names", "births", "titles", "years")
+SECTIONS = ARRAYS + tuple(section for name in STRINGS
+                          for section in (f"{name}_offsets", name))
+
+# Tables sorted by the *_order arrays, for lookups by binary search
+ORDERS = ("person_ids", "movie_ids", "names")
+
+# magic, format version, byte order, item size of the integer arrays
+HEADER = struct.Struct("<8sI8sI")
+# size, modification time and sha256 of a source file
+SOURCE = struct.Struct("<Qq32s")
+# offset and length of a section
+SECTION = struct.Struct("<QQ")
+
+
+def source_stamps(directory, checksums=True):
+    """
+    Returns (size, mtime, sha256) for every source CSV file.
+
+    If checksums is False, the sha256 is left empty.
+    """
+    stamps = []
+    for name in SOURCES:
+        path = os.path.join(directory, name)
+        stat = os.stat(path)
+        digest = b""
+        if checksums:
+            sha = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    sha.update(block)
+            digest = sha.digest()
+        stamps.append((stat.st_size, stat.st_mtime_ns, digest))
+    return stamps
+
+
+def sources_changed(directory, view, offset):
+    """
+    Returns True if the source CSV files differ from the stamps
+    stored in view at offset.
+    """
+    stored = []
+    for _ in SOURCES:
+        stored.append(SOURCE.unpack_from(view, offset))
+        offset += SOURCE.size
+
+    # compare size and modification time first,
+    # only hash the sources again when those changed
+    current = source_stamps(directory, checksums=False)
+    if all(stamp[:2] == mark[:2] for stamp, mark in zip(stored, current)):
+        return False
+    current = source_stamps(directory)
+    return any(stamp[::2] != mark[::2] for stamp, mark in zip(stored, current))
+
+
+def write_snapshot(directory, graph):
+    """
+    Writes a binary snapshot of the graph and its metadata
+    to the snapshot file of the directory.
+    """
+    arrays = [graph.offsets, graph.neighbors, graph.movies,
+              graph.components] + [graph.orders[name] for name in ORDERS]
+    tables = [graph.person_ids, graph.movie_ids] + [
+        graph.metadata[field]
+        for field in ("names", "births", "titles", "years")
+    ]
+    sections = arrays + [section for table in tables
+                         for section in (table.offsets, table.data)]
+
+    header_size = (HEADER.size + SOURCE.size * len(SOURCES)
+                   + SECTION.size * len(sections))
+
+    # lay out the sections one after the other,
+    # 8 byte aligned so arrays can be cast straight from the map
+    layout = []
+    offset = header_size
+    for section in sections:
+        offset += -offset % 8
+        length = len(section) * getattr(section, "itemsize", 1)
+        layout.append((offset, length))
+        offset += length
+
+    # write to a temporary file first, readers never see a partial snapshot
+    path = os.path.join(directory, SNAPSHOT)
+    with open(path + ".tmp", "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION,
+                            sys.byteorder.encode(), graph.offsets.itemsize))
+        for stamp in source_stamps(directory):
+            f.write(SOURCE.pack(*stamp))
+        for section_offset, length in layout:
+            f.write(SECTION.pack(section_offset, length))
+        for section, (section_offset, length) in zip(sections, layout):
+            f.write(b"\0" * (section_offset - f.tell()))
+            f.write(section)
+    os.replace(path + ".tmp", path)
+
+
+def map_sections(directory):
+    """
+    Memory-maps the snapshot file of the directory and returns
+    a dictionary mapping the name of every section to a view of it.
+
+    Returns None if there is no snapshot, if it was written by another
+    format version or if the source CSV files changed since.
+    """
+    path = os.path.join(directory, SNAPSHOT)
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            return None
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(data)
+    magic, version, byteorder, itemsize = HEADER.unpack_from(view)
+    byteorder = byteorder.rstrip(b"\0").decode()
+    if (magic != MAGIC or version != FORMAT_VERSION
+            or byteorder != sys.byteorder or itemsize != 4):
+        return None
+
+    offset = HEADER.size
+    if sources_changed(directory, view, offset):
+        return None
+    offset += SOURCE.size * len(SOURCES)
+
+    sections = {}
+    for name in SECTIONS:
+        section_offset, length = SECTION.unpack_from(view, offset)
+        sections[name] = view[section_offset:section_offset + length]
+        offset += SECTION.size
+    return sections
+
+
+def read_arrays(directory, names=("offsets", "neighbors", "components")):
+    """
+    Memory-maps the snapshot file of the directory and returns
+    the integer arrays with the given names, nothing else is decoded,
+    so processes reading them share every page.
+
+    Returns None like read_snapshot.
+    """
+    sections = map_sections(directory)
+    if sections is None:
+        return None
+    return {name: sections[name].cast("i") for name in names}
+
+
+def read_snapshot(directory):
+    """
+    Memory-maps the snapshot file of the directory and returns the graph.
+    Nothing is decoded up front, names and ids are looked up by binary
+    search in the sorted orders stored with them.
+
+    Returns None if there is no snapshot, if it was written by another
+    format version or if the source CSV files changed since.
+    """
+    sections = map_sections(directory)
+    if sections is None:
+        return None
+
+    arrays = {name: sections[name].cast("i") for name in ARRAYS}
+    tables = {name: StringTable(sections[f"{name}_offsets"].cast("i"),
+                                sections[name])
+              for name in STRINGS}
+
+    metadata = {
+        field: tables[field]
+        for field in ("names", "births", "titles", "years")
+    }
+    orders = {name: arrays[f"{name}_order"] for name in ORDERS}
+    return Graph(tables["person_ids"], tables["movie_ids"],
+                 arrays["offsets"], arrays["neighbors"], arrays["movies"],
+                 metadata, arrays["components"], orders)
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python snapshot.py [directory]")
+    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+
+    from degrees import load_data, load_graph
+
+    print("Loading data...")
+    load_data(directory)
+    write_snapshot(directory, load_graph())
+    print(f"Snapshot written to {os.path.join(directory, SNAPSHOT)}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Self-play benchmark for the Tic Tac Toe AI
+
+Plays a full AI vs AI game from every reachable opening position
+and records the nodes searched and the wall time of every move,
+and the peak memory of every game, as JSON.
+
+The minimax engine is the original AI, helpers included, frozen in
+baseline.py as a fixed reference for the other engines. The book engine answers from
+a table, its moves report null nodes.
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+
+import baseline
+import book
+import mnk
+import tictactoe as ttt
+
+# Number of moves played to make the opening positions
+PLIES = 2
+
+
+def book_engine():
+    """minimax as runner.py calls it: the book, then the search."""
+    book.book = book.load_book()
+
+    def move(board):
+        nodes = ttt.nodes_searched
+        action = ttt.minimax(board)
+        # a book lookup searches no nodes, only count a search
+        # for positions the book doesn't have
+        return action, (ttt.nodes_searched - nodes) or None
+    return move
+
+
+def minimax_engine():
+    """
+    The original AI frozen in baseline.py: plain recursive minimax
+    over list of lists boards, counting every board visited.
+    """
+    def move(board):
+        nodes = baseline.nodes_searched
+        action = baseline.minimax(board)
+        return action, baseline.nodes_searched - nodes
+    return move
+
+
+def search_engine():
+    """The alpha-beta search alone, with an empty table for every move."""
+    def move(board):
+        ttt.transpositions.clear()
+        nodes = ttt.nodes_searched
+        if ttt.player(board) == ttt.X:
+            action, _ = ttt.max_value(board)
+        else:
+            action, _ = ttt.min_value(board)
+        return action, ttt.nodes_searched - nodes
+    return move
+
+
+def mnk_engine():
+    """The generalised m,n,k engine on a 3x3 board."""
+    game = mnk.Game(3, 3, 3)
+
+    def move(board):
+        nodes = game.nodes
+        action = game.best_move(board, time_limit=mnk.TIME_LIMIT)
+        return action, game.nodes - nodes
+    return move
+
+
+ENGINES = {
+    "minimax": minimax_engine,
+    "book": book_engine,
+    "search": search_engine,
+    "mnk": mnk_engine,
+}
+
+
+def main():
+    if len(sys.argv) > 4:
+        sys.exit("Usage: python benchmark.py [engine] [plies] [output]")
+    engine = sys.argv[1] if len(sys.argv) >= 2 else "book"
+    plies = int(sys.argv[2]) if len(sys.argv) >= 3 else PLIES
+    if engine not in ENGINES:
+        sys.exit(f"Unknown engine, choose one of: {', '.join(ENGINES)}")
+
+    results = benchmark(ENGINES[engine](), openings(plies))
+    results["engine"] = engine
+    results["plies"] = plies
+
+    if len(sys.argv) == 4:
+        with open(sys.argv[3], "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+def openings(plies):
+    """
+    Returns every distinct board reachable with plies moves
+    where the game is not over yet.
+    """
+    boards = [ttt.initial_state()]
+    for _ in range(plies):
+        next_boards = {}
+        for board in boards:
+            for action in ttt.actions(board):
+                new_board = ttt.result(board, action)
+                if not ttt.terminal(new_board):
+                    next_boards[str(new_board)] = new_board
+        boards = list(next_boards.values())
+    return boards
+
+
+def play(move, board):
+    """
+    Plays the game out from board, both sides using move.
+    Returns the final board and (nodes, seconds) for every move.
+    """
+    moves = []
+    while not ttt.terminal(board):
+        start = time.perf_counter()
+        action, nodes = move(board)
+        moves.append((nodes, time.perf_counter() - start))
+        board = ttt.result(board, action)
+    return board, moves
+
+
+def benchmark(move, boards):
+    """
+    Plays every opening board out and collects the measurements.
+    """
+    games = []
+    for opening in boards:
+        board, moves = play(move, opening)
+
+        # replay the game with allocation tracing for the peak memory,
+        # tracing would distort the timings of the first run
+        tracemalloc.start()
+        play(move, opening)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        games.append({
+            "opening": opening,
+            "utility": ttt.utility(board),
+            "moves": [{"nodes": nodes, "seconds": seconds}
+                      for nodes, seconds in moves],
+            "peak_memory": peak,
+        })
+
+    times = [m["seconds"] for game in games for m in game["moves"]]
+    nodes = [m["nodes"] for game in games for m in game["moves"]]
+    return {
+        "games": len(games),
+        "moves": len(times),
+        "nodes": None if None in nodes else sum(nodes),
+        "seconds": {
+            "total": sum(times),
+            "mean": sum(times) / len(times) if times else 0,
+            "max": max(times, default=0),
+        },
+        "peak_memory": max((game["peak_memory"] for game in games), default=0),
+        "results": games,
+    }
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Bitboard representation of a Tic Tac Toe board
+
+A board is a pair of 9-bit integers (x, o), one per player,
+where bit 3 * i + j is set if the player has a mark on cell (i, j).
+"""
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# All 9 cells of the board
+FULL = 0b111111111
+
+# Bit of every cell, indexed by 3 * i + j
+CELLS = [1 << k for k in range(9)]
+
+# Cells of every row, column and diagonal
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+)
+
+
+def to_bits(board):
+    """
+    Returns the (x, o) bitboards of a list of lists board.
+    """
+    x = o = 0
+    for i, line in enumerate(board):
+        for j, cell in enumerate(line):
+            if cell == X:
+                x |= CELLS[3 * i + j]
+            elif cell == O:
+                o |= CELLS[3 * i + j]
+    return x, o
+
+
+def from_bits(x, o):
+    """
+    Returns the list of lists board of the (x, o) bitboards.
+    """
+    return [[X if x & CELLS[3 * i + j] else O if o & CELLS[3 * i + j]
+             else EMPTY for j in range(3)] for i in range(3)]
+
+
+def player(x, o):
+    """
+    Returns player who has the next turn, None for an impossible board.
+    """
+    turns_X = x.bit_count()
+    turns_O = o.bit_count()
+    if turns_X == turns_O:
+        return X
+    elif turns_X == turns_O + 1:
+        return O
+    return None
+
+
+def actions(x, o):
+    """
+    Returns the list of empty cell indexes.
+    """
+    empty = FULL & ~(x | o)
+    return [k for k in range(9) if empty & CELLS[k]]
+
+
+def wins(bits):
+    """
+    Returns True if the player owning bits has a full line.
+    """
+    for mask in WIN_MASKS:
+        if bits & mask == mask:
+            return True
+    return False
+
+
+def winner(x, o):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    if wins(x):
+        return X
+    if wins(o):
+        return O
+    return None
+
+
+def terminal(x, o):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return (x | o) == FULL or wins(x) or wins(o)
+
+
+def symmetries():
+    """
+    Returns the 8 rotations and reflections of the board
+    as lists of the cell index moved to each position.
+    """
+
+    # start from the identity, rotate it 4 times by 90 degrees
+    # and add the mirror image of every rotation
+    orderings = []
+    cells = [(i, j) for i in range(3) for j in range(3)]
+    for _ in range(4):
+        orderings.append(cells)
+        orderings.append([(i, 2 - j) for i, j in cells])
+        cells = [(j, 2 - i) for i, j in cells]
+    return [[3 * i + j for i, j in cells] for cells in orderings]
+
+
+SYMMETRIES = symmetries()
+
+# TRANSFORMS[s][bits] is bits with symmetry s applied,
+# precomputed for all 512 bitboards
+TRANSFORMS = [
+    [sum(CELLS[k] for k, source in enumerate(symmetry) if bits & CELLS[source])
+     for bits in range(FULL + 1)]
+    for symmetry in SYMMETRIES
+]
+
+
+def canonical(x, o):
+    """
+    Returns the same key for a board and all its rotations and reflections.
+    """
+    return min(transform[x] << 9 | transform[o] for transform in TRANSFORMS)
+
+
+def canonical_symmetry(x, o):
+    """
+    Returns the canonical key of a board and the index
+    of the symmetry that turns the board into it.
+    """
+    return min((transform[x] << 9 | transform[o], symmetry)
+               for symmetry, transform in enumerate(TRANSFORMS))
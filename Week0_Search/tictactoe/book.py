@@ -0,0 +1,152 @@
+"""
+Precomputed book of optimal Tic Tac Toe moves
+
+Every reachable position is solved once, in the canonical orientation
+of its 8 rotations and reflections, and the best move of each canonical
+position is stored in a small binary table.
+"""
+
+import os
+import struct
+import sys
+
+import bitboard as bb
+
+# File the book is written to, next to this module
+BOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+
+# Bump whenever the layout below changes, older books are then rebuilt
+FORMAT_VERSION = 1
+
+MAGIC = b"TTTBOOK\0"
+
+# magic, format version, number of positions
+HEADER = struct.Struct("<8sII")
+
+# canonical key of a position and the best cell for it
+RECORD = struct.Struct("<IB")
+
+# Book loaded by best_move, read or built on first use
+book = None
+
+
+def solve():
+    """
+    Returns a dictionary mapping the canonical key of every reachable
+    position where the game is not over to its best cell, in the
+    canonical orientation.
+    """
+    values = {}
+    moves = {}
+
+    def value(x, o):
+        """Returns the utility value of the (x, o) bitboards."""
+        if bb.wins(x):
+            return 1
+        if bb.wins(o):
+            return -1
+        if (x | o) == bb.FULL:
+            return 0
+
+        key = bb.canonical(x, o)
+        if key in values:
+            return values[key]
+
+        # solve the canonical orientation so the best cell is stored in it
+        x, o = key >> 9, key & bb.FULL
+        maximizing = bb.player(x, o) == bb.X
+        best_value = best_cell = None
+        for cell in bb.actions(x, o):
+            if maximizing:
+                new_value = value(x | bb.CELLS[cell], o)
+            else:
+                new_value = value(x, o | bb.CELLS[cell])
+            if (best_value is None or (maximizing and new_value > best_value)
+                    or (not maximizing and new_value < best_value)):
+                best_value, best_cell = new_value, cell
+
+        values[key] = best_value
+        moves[key] = best_cell
+        return best_value
+
+    value(0, 0)
+    return moves
+
+
+def write_book(moves, path=BOOK):
+    """
+    Writes the book to path, one fixed size record per position.
+    """
+    with open(path + ".tmp", "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(moves)))
+        for key in sorted(moves):
+            f.write(RECORD.pack(key, moves[key]))
+    os.replace(path + ".tmp", path)
+
+
+def read_book(path=BOOK):
+    """
+    Returns the book stored at path,
+    None if it is missing or was written by another format version.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    if len(data) < HEADER.size:
+        return None
+    magic, version, count = HEADER.unpack_from(data)
+    if (magic != MAGIC or version != FORMAT_VERSION
+            or len(data) != HEADER.size + count * RECORD.size):
+        return None
+    return dict(RECORD.iter_unpack(data[HEADER.size:]))
+
+
+def load_book(path=BOOK):
+    """
+    Returns the book stored at path, solving and writing it first
+    if it is missing or out of date.
+    """
+    moves = read_book(path)
+    if moves is None:
+        moves = solve()
+        try:
+            write_book(moves, path)
+        except OSError:
+            # the book still works from memory for this run
+            pass
+    return moves
+
+
+def best_move(x, o):
+    """
+    Returns the best cell for the (x, o) bitboards in their own
+    orientation, None if the game is over or the position can't be
+    reached in a game.
+    """
+    global book
+    if book is None:
+        book = load_book()
+
+    # the stored cell is in the canonical orientation,
+    # map it back through the symmetry that gave the canonical key
+    key, symmetry = bb.canonical_symmetry(x, o)
+    cell = book.get(key)
+    if cell is None:
+        return None
+    return bb.SYMMETRIES[symmetry][cell]
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python book.py [path]")
+    path = sys.argv[1] if len(sys.argv) == 2 else BOOK
+
+    moves = solve()
+    write_book(moves, path)
+    print(f"Book of {len(moves)} positions written to {path}.")
+
+
+if __name__ == "__main__":
+    main()
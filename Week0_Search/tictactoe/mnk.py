@@ -0,0 +1,278 @@
+"""
+Generalised m,n,k-game engine
+
+Boards of any size where a player wins with k marks in a row,
+like 4x4 or 5x5 Tic Tac Toe and Gomoku. The search is a depth-limited
+alpha-beta with iterative deepening under a time budget, and positions
+that are cut off are scored with a heuristic evaluation.
+"""
+
+import math
+import time
+
+from tictactoe import X, O, EMPTY
+
+# Seconds the search may take for one move
+TIME_LIMIT = 1.0
+
+# Utility of a win, the heuristic always stays below it
+WIN = 1_000_000
+
+# Flags of the transposition table entries:
+# the value is exact, a lower bound or an upper bound
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+class Timeout(Exception):
+    """Raised inside the search when the time budget is spent."""
+
+
+class Game():
+    """
+    Rules of an m,n,k-game on a rows x cols board.
+
+    A board is a pair of bitboards, one per player,
+    where bit cols * i + j is set if the player has a mark on (i, j).
+    """
+
+    def __init__(self, rows=3, cols=3, k=3):
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.cells = rows * cols
+        self.full = (1 << self.cells) - 1
+
+        # every run of k cells in a row, column or diagonal
+        self.windows = []
+        for i in range(rows):
+            for j in range(cols):
+                for di, dj in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+                    end_i = i + di * (k - 1)
+                    end_j = j + dj * (k - 1)
+                    if 0 <= end_i < rows and 0 <= end_j < cols:
+                        self.windows.append(sum(
+                            1 << (cols * (i + di * step) + j + dj * step)
+                            for step in range(k)
+                        ))
+
+        # windows through each cell, the only ones a move there can complete
+        self.cell_windows = [
+            [window for window in self.windows if window >> cell & 1]
+            for cell in range(self.cells)
+        ]
+
+        # cells around each cell, moves far from every mark are not tried
+        self.neighborhood = []
+        for cell in range(self.cells):
+            i, j = divmod(cell, cols)
+            mask = 0
+            for ni in range(max(i - 1, 0), min(i + 2, rows)):
+                for nj in range(max(j - 1, 0), min(j + 2, cols)):
+                    mask |= 1 << (cols * ni + nj)
+            self.neighborhood.append(mask)
+
+        # try the cells on the most windows first, then the cells
+        # closest to the centre, twice the offset keeps it integer
+        def centre_distance(cell):
+            i, j = divmod(cell, cols)
+            return (2 * i - rows + 1) ** 2 + (2 * j - cols + 1) ** 2
+
+        self.order = sorted(
+            range(self.cells),
+            key=lambda cell: (-len(self.cell_windows[cell]),
+                              centre_distance(cell))
+        )
+
+        self.transpositions = {}
+        self.nodes = 0
+        self.deadline = math.inf
+
+    def to_bits(self, board):
+        """
+        Returns the (x, o) bitboards of a list of lists board.
+        """
+        x = o = 0
+        for i, line in enumerate(board):
+            for j, cell in enumerate(line):
+                if cell == X:
+                    x |= 1 << (self.cols * i + j)
+                elif cell == O:
+                    o |= 1 << (self.cols * i + j)
+        return x, o
+
+    def from_bits(self, x, o):
+        """
+        Returns the list of lists board of the (x, o) bitboards.
+        """
+        board = []
+        for i in range(self.rows):
+            line = []
+            for j in range(self.cols):
+                bit = 1 << (self.cols * i + j)
+                line.append(X if x & bit else O if o & bit else EMPTY)
+            board.append(line)
+        return board
+
+    def completes(self, bits, cell):
+        """
+        Returns True if the mark on cell completes k in a row for bits,
+        only looking at the windows through that cell.
+        """
+        for window in self.cell_windows[cell]:
+            if bits & window == window:
+                return True
+        return False
+
+    def winner(self, x, o):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        for window in self.windows:
+            if x & window == window:
+                return X
+            if o & window == window:
+                return O
+        return None
+
+    def evaluate(self, me, opponent):
+        """
+        Scores a position for the player to move: every window still open
+        to a single player counts for that player, more the fuller it is.
+        """
+        score = 0
+        for window in self.windows:
+            mine = me & window
+            theirs = opponent & window
+            if mine and not theirs:
+                score += 4 ** mine.bit_count()
+            elif theirs and not mine:
+                score -= 4 ** theirs.bit_count()
+        return score
+
+    def moves(self, me, opponent):
+        """
+        Returns the empty cells worth trying, in search order.
+        """
+        taken = me | opponent
+        if not taken:
+            return [self.order[0]]
+
+        # on large boards only cells next to a mark are candidates
+        if self.cells > 16:
+            near = 0
+            for cell in range(self.cells):
+                if taken >> cell & 1:
+                    near |= self.neighborhood[cell]
+            candidates = near & ~taken
+        else:
+            candidates = self.full & ~taken
+        return [cell for cell in self.order if candidates >> cell & 1]
+
+    def search(self, me, opponent, depth, alpha, beta, ply):
+        """
+        Returns the negamax value of the position for the player to move,
+        searching depth more moves, or a bound of it outside the
+        (alpha, beta) window.
+        """
+        self.nodes += 1
+        if self.nodes & 255 == 0 and time.perf_counter() > self.deadline:
+            raise Timeout
+
+        if (me | opponent) == self.full:
+            return 0
+        if depth == 0:
+            return self.evaluate(me, opponent)
+
+        key = (me, opponent)
+        entry = self.transpositions.get(key)
+        best_cell = None
+        if entry is not None:
+            entry_depth, value, flag, best_cell = entry
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return value
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        window = alpha
+        moves = self.moves(me, opponent)
+        if best_cell in moves:
+            moves.remove(best_cell)
+            moves.insert(0, best_cell)
+
+        value = -math.inf
+        for cell in moves:
+            bits = me | 1 << cell
+
+            # a win ends the game at once, sooner wins score higher
+            if self.completes(bits, cell):
+                score = WIN - ply
+            else:
+                score = -self.search(opponent, bits, depth - 1,
+                                     -beta, -alpha, ply + 1)
+            if score > value:
+                value = score
+                best_cell = cell
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        if value <= window:
+            flag = UPPER
+        elif value >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.transpositions[key] = (depth, value, flag, best_cell)
+        return value
+
+    def best_move(self, board, time_limit=TIME_LIMIT, max_depth=None):
+        """
+        Returns the best move (i, j) for the player to move on board,
+        searching one level deeper each time until time_limit seconds
+        have passed, max_depth is reached or the game is solved.
+        """
+        x, o = self.to_bits(board)
+        if self.winner(x, o) is not None or (x | o) == self.full:
+            return None
+        if x.bit_count() == o.bit_count():
+            me, opponent = x, o
+        else:
+            me, opponent = o, x
+
+        empty = (self.full & ~(x | o)).bit_count()
+        max_depth = empty if max_depth is None else min(max_depth, empty)
+
+        self.transpositions.clear()
+        self.deadline = time.perf_counter() + time_limit
+        best_cell = self.moves(me, opponent)[0]
+
+        for depth in range(1, max_depth + 1):
+            try:
+                value = self.search(me, opponent, depth,
+                                    -math.inf, math.inf, 0)
+            except Timeout:
+                break
+            best_cell = self.transpositions[(me, opponent)][3]
+
+            # a forced win or loss won't change with a deeper search
+            if abs(value) >= WIN - self.cells:
+                break
+
+        return divmod(best_cell, self.cols)
+
+
+def best_move(board, k=3, time_limit=TIME_LIMIT, max_depth=None):
+    """
+    Returns the best move (i, j) on a list of lists board of any size
+    for a game won with k in a row.
+    """
+    return Game(len(board), len(board[0]), k).best_move(
+        board, time_limit, max_depth
+    )
@@ -1,6 +1,8 @@
 import pygame
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import tictactoe as ttt
 
@@ -19,12 +21,22 @@ moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
 user = None
 board = ttt.initial_state()
-ai_turn = False
+
+# The AI searches on a worker thread, the loop polls for its move
+# every frame so the window keeps responding in the meantime,
+# setting ai_cancel makes the running search stop within a few nodes
+executor = ThreadPoolExecutor(max_workers=1)
+ai_move = None
+ai_cancel = threading.Event()
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            # the worker thread is joined at exit,
+            # stop its search so that join doesn't wait for it
+            ai_cancel.set()
+            executor.shutdown(wait=False, cancel_futures=True)
             sys.exit()
 
     screen.fill(black)
@@ -110,13 +122,31 @@ while True:
 
         # Check for AI move
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if ai_move is None:
+                ai_cancel = threading.Event()
+                ai_move = executor.submit(ttt.minimax, board, ai_cancel)
+            elif ai_move.done():
+                board = ttt.result(board, ai_move.result())
+                ai_move = None
+
+        # While the computer is thinking, let the user go back
+        # to the start, stopping the search for the old game
+        if ai_move is not None:
+            backButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
+            back = mediumFont.render("Back", True, black)
+            backRect = back.get_rect()
+            backRect.center = backButton.center
+            pygame.draw.rect(screen, white, backButton)
+            screen.blit(back, backRect)
+            click, _, _ = pygame.mouse.get_pressed()
+            if click == 1:
+                mouse = pygame.mouse.get_pos()
+                if backButton.collidepoint(mouse):
+                    time.sleep(0.2)
+                    ai_cancel.set()
+                    ai_move = None
+                    user = None
+                    board = ttt.initial_state()
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -141,6 +171,5 @@ while True:
                     time.sleep(0.2)
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
 
     pygame.display.flip()
@@ -3,118 +3,32 @@ Tic Tac Toe Player
 """
 
 import math
-from copy import deepcopy
+
+import bitboard as bb
+import book
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Flags of the transposition table entries:
+# the value is exact, a lower bound or an upper bound
+EXACT = 0
+LOWER = 1
+UPPER = 2
 
-def occurrences(board, variable):
-    """
-    Returns the number of occurrences on the board for
-    the variable provided 
-    """
-    return sum([line.count(variable) for line in board])
-
-
-def generate_cells_idx(board, variable):
-    """
-    Returns a set of index pairs(i, j) for each cell 
-    that contains the variable 
-    """
-
-    # Initialize an empty set
-    cells_idx = set()
-
-    for i in range(len(board)):
-        for j in range(len(board[i])):
-            if board[i][j] == variable:
-               cells_idx.add((i,j))
-
-    return cells_idx 
-
-
-
-def row_moves(moves):
-    """
-    Count all the moves made by variable (X or O) horizontally  
-    Moves is a set of (i, j) pairs for each cell where the variable made a move  
-    """
+# Maps the canonical key of a board to its value and flag
+transpositions = {}
 
-    # keep track of all lines where the variable made a move
-    lines = []
+# Number of positions alphabeta has visited, for benchmarks
+nodes_searched = 0
 
-    for move in moves:
-        lines.append(move[0])
-    
-    # if the variable occurs 3 times on one line
-    # we found a winner
-    if lines.count(0) == 3:
-        return True
-    if lines.count(1) == 3:
-        return True
-    if lines.count(2) == 3:
-        return True
-    
-    # otherwise keep playing
-    return False
-
-
-def cols_moves(moves):
-    """
-    Count all the moves made by variable (X or O) vertically
-    Moves is a set of (i, j) pairs for each cell where the variable made a move  
-    """
-
-    # keep track of all lines where the variable made a move
-    cols = []
-
-    for move in moves:
-        cols.append(move[1])
-    
-    # if the variable occurs 3 times on one column
-    # we found a winner
-    if cols.count(0) == 3:
-        return True
-    if cols.count(1) == 3:
-        return True
-    if cols.count(2) == 3:
-        return True
-    
-    # otherwise keep playing
-    return False
-
-
-def diag_prim_moves(moves):
-    """
-    Count all the moves made by variable (X or O) for primary diagonal
-    Moves is a set of (i, j) pairs for each cell where the variable made a move  
-    """
+# Event of the running search, once set the search stops early
+search_cancelled = None
 
-    # check if all primary diagonal coordonates
-    # are in the set of the moves received
-    diag_prim = {(0,0), (1,1), (2,2)}
 
-    diag_is_in_moves = diag_prim.issubset(moves)
-
-    return diag_is_in_moves
-
-
-
-def diag_sec_moves(moves):
-    """
-    Count all the moves made by variable (X or O) for secondary diagonal
-    Moves is a set of (i, j) pairs for each cell where the variable made a move  
-    """
-
-    # check if all secondary diagonal coordonates
-    # are in the set of the moves received
-    diag_sec = {(0,2), (1,1), (2,0)}
-
-    diag_is_in_moves = diag_sec.issubset(moves)
-
-    return diag_is_in_moves
+class Cancelled(Exception):
+    """Raised inside the search when its cancel event is set."""
 
 
 def max_value(board):
@@ -124,16 +38,22 @@ def max_value(board):
 
     if terminal(board):
         return None, utility(board)
+    x, o = bb.to_bits(board)
     value = -math.inf
     best_move = None
 
     # keep track of action that leads to value change 
     # save it in best_move
-    for action in actions(board):
-        new_move, new_value = min_value(result(board, action))
-        if max(value, new_value) is not value:
+    # only moves that beat the current value matter,
+    # so search each one with the current value as lower bound
+    for cell in bb.actions(x, o):
+        new_value = alphabeta(x | bb.CELLS[cell], o, value, math.inf)
+        if new_value > value:
             value = new_value
-            best_move = action
+            best_move = divmod(cell, 3)
+        # X can't do better than winning
+        if value == 1:
+            break
     return best_move, value
 
 
@@ -145,19 +65,89 @@ def min_value(board):
 
     if terminal(board):
         return None, utility(board)
+    x, o = bb.to_bits(board)
     value = math.inf
     best_move = None
 
     # keep track of action that leads to value change 
     # save it in best_move
-    for action in actions(board):
-        new_move, new_value = max_value(result(board, action))
-        if min(value, new_value) is not value:
+    # only moves that beat the current value matter,
+    # so search each one with the current value as upper bound
+    for cell in bb.actions(x, o):
+        new_value = alphabeta(x, o | bb.CELLS[cell], -math.inf, value)
+        if new_value < value:
             value = new_value
-            best_move = action
+            best_move = divmod(cell, 3)
+        # O can't do better than winning
+        if value == -1:
+            break
     return best_move, value
 
 
+def alphabeta(x, o, alpha, beta):
+    """
+    Returns the utility value of the (x, o) bitboards with optimal play,
+    or a bound of it outside the (alpha, beta) window
+    """
+
+    global nodes_searched
+    nodes_searched += 1
+    if (nodes_searched & 255 == 0 and search_cancelled is not None
+            and search_cancelled.is_set()):
+        raise Cancelled
+
+    # terminal boards
+    if bb.wins(x):
+        return 1
+    if bb.wins(o):
+        return -1
+    possible_actions = bb.actions(x, o)
+    if not possible_actions:
+        return 0
+
+    # reuse the value of this board, or of a symmetric one,
+    # from an earlier search
+    key = bb.canonical(x, o)
+    entry = transpositions.get(key)
+    if entry is not None:
+        value, flag = entry
+        if flag == EXACT:
+            return value
+        if flag == LOWER:
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+        if alpha >= beta:
+            return value
+
+    window = alpha, beta
+
+    # stop searching moves as soon as the other player
+    # already has a better option elsewhere in the tree
+    if bb.player(x, o) == X:
+        value = -math.inf
+        for cell in possible_actions:
+            value = max(value, alphabeta(x | bb.CELLS[cell], o, alpha, beta))
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+    else:
+        value = math.inf
+        for cell in possible_actions:
+            value = min(value, alphabeta(x, o | bb.CELLS[cell], alpha, beta))
+            beta = min(beta, value)
+            if alpha >= beta:
+                break
+
+    # a value outside the window is only a bound of the real value
+    if value <= window[0]:
+        transpositions[key] = (value, UPPER)
+    elif value >= window[1]:
+        transpositions[key] = (value, LOWER)
+    else:
+        transpositions[key] = (value, EXACT)
+    return value
+
 
 def initial_state():
     """
@@ -178,16 +168,7 @@ def player(board):
     # 1. Empty board -> Turn: X
     # 2. X has an extra turn -> Turn: O
     # 3. Equal turns -> Turn: X
-    count_EMPTY = occurrences(board, EMPTY)
-    turns_X = occurrences(board, X)
-    turns_O  = occurrences(board, O)
-
-    if count_EMPTY == 9:
-        return X
-    elif turns_O == turns_X - 1:
-        return O
-    elif turns_O == turns_X:
-        return X
+    return bb.player(*bb.to_bits(board))
 
 
 def actions(board):
@@ -195,9 +176,7 @@ def actions(board):
     Returns set of all possible actions (i, j) available on the board.
     """
 
-    possible_actions = generate_cells_idx(board, EMPTY)
-
-    return possible_actions
+    return {divmod(cell, 3) for cell in bb.actions(*bb.to_bits(board))}
 
 
 def result(board, action):
@@ -205,23 +184,27 @@ def result(board, action):
     Returns the board that results from making move (i, j) on the board.
     """
 
-    # create a new state of the board
-    new_board_state = deepcopy(board)
     i = action[0]
     j = action[1]
-    if not new_board_state[i][j] == EMPTY:
-        raise ValueError("Cell is not empty")
-
     if i < 0 or i > 2:
         raise ValueError("Invalid board index")
     
     if j < 0 or j > 2:
         raise ValueError("Invalid board index")
 
+    x, o = bb.to_bits(board)
+    cell = bb.CELLS[3 * i + j]
+    if (x | o) & cell:
+        raise ValueError("Cell is not empty")
+
     # change the cell according to the input action 
-    new_board_state[i][j] = player(board)
+    # and create a new state of the board
+    if bb.player(x, o) == X:
+        x |= cell
+    else:
+        o |= cell
 
-    return new_board_state
+    return bb.from_bits(x, o)
 
 
 def winner(board):
@@ -229,33 +212,8 @@ def winner(board):
     Returns the winner of the game, if there is one.
     """
 
-    # search the winner of the game based on the state of the game
-    count_EMPTY = occurrences(board, EMPTY)
-    turns_X = occurrences(board, X)
-    turns_O  = occurrences(board, O)
-
-    # empty board -> no winner
-    if count_EMPTY == 9:
-        return None    
-    
-    # X and O made less than 3 moves -> game in progress
-    if turns_X < 3 and turns_O < 3:
-        return None
-
-    # check if X is the winner 
-    if turns_X >= 3:
-        moves_X = generate_cells_idx(board, X)
-        if row_moves(moves_X) or cols_moves(moves_X) or diag_prim_moves(moves_X) or diag_sec_moves(moves_X):
-            return X
-
-    # check if O is the winner
-    if turns_O >= 3:
-        moves_O = generate_cells_idx(board, O)
-        if row_moves(moves_O) or cols_moves(moves_O) or diag_prim_moves(moves_O) or diag_sec_moves(moves_O):
-            return O
-
-    # don't have a winner for this board state
-    return None
+    # a player wins when all cells of one of the win masks are theirs
+    return bb.winner(*bb.to_bits(board))
 
 
 
@@ -267,13 +225,7 @@ def terminal(board):
     # found winner -> board is in terminal state 
     # no winner and no empty cells left for other moves -> board is in terminal state 
     # otherwise, the game can continue
-    get_winner = winner(board)
-    if get_winner == X or get_winner == O:
-        return True
-    elif occurrences(board, EMPTY) == 0:
-        return True
-    else:
-        return False
+    return bb.terminal(*bb.to_bits(board))
 
 
 
@@ -283,23 +235,32 @@ def utility(board):
     """
 
     if terminal(board):
-        if winner(board) == X:
+        get_winner = winner(board)
+        if get_winner == X:
             return 1
-        elif winner(board) == O:
+        elif get_winner == O:
             return -1
         else:
             return 0
 
 
 
-def minimax(board):
+def minimax(board, cancelled=None):
     """
     Returns the optimal action for the current player on the board.
+    Raises Cancelled if the cancelled event is set during the search.
     """
+    global search_cancelled
+    search_cancelled = cancelled
 
     if terminal(board):
         return None
 
+    # positions reachable in a game are answered from the opening book
+    cell = book.best_move(*bb.to_bits(board))
+    if cell is not None:
+        return divmod(cell, 3)
+
     # get the optimal move based on player
     if player(board) == X:
         optimal_move, value = max_value(board)
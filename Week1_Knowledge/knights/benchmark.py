@@ -0,0 +1,143 @@
+"""
+Benchmark of the entailment backends on generated puzzles
+
+Solves random Knights and Knaves puzzles of a growing number of
+characters, asking for every knight and knave symbol like puzzle.py,
+and records the time and the models visited by the backend as JSON.
+"""
+
+import json
+import sys
+import time
+
+import logic
+import sat
+from generator import random_puzzle
+
+# Puzzles go up to this many characters, two symbols each
+CHARACTERS = 6
+
+# Statements per character, and puzzles per number of characters
+STATEMENTS = 2
+PUZZLES = 3
+
+
+def enumerate_engine():
+    """logic.model_check once per symbol."""
+    def solve(knowledge, symbols):
+        checked = logic.models_checked
+        entailed = [s for s in symbols if logic.model_check(knowledge, s)]
+        return entailed, logic.models_checked - checked
+    return solve
+
+
+def knowledge_base_engine():
+    """The models of a KnowledgeBase, enumerated once for all symbols."""
+    def solve(knowledge, symbols):
+        checked = logic.models_checked
+        literals = logic.KnowledgeBase(knowledge).entailed_literals(symbols)
+        entailed = [s for s in symbols if s in literals]
+        return entailed, logic.models_checked - checked
+    return solve
+
+
+def sat_engine():
+    """The DPLL solver once per symbol, counting decisions."""
+    def solve(knowledge, symbols):
+        decisions = sat.decisions
+        entailed = [s for s in symbols if sat.model_check(knowledge, s)]
+        return entailed, sat.decisions - decisions
+    return solve
+
+
+def vectorized_engine():
+    """Blocks of models as NumPy arrays, once per symbol."""
+    import vectorized
+
+    def solve(knowledge, symbols):
+        checked = vectorized.models_checked
+        entailed = [s for s in symbols
+                    if vectorized.model_check(knowledge, s)]
+        return entailed, vectorized.models_checked - checked
+    return solve
+
+
+def parallel_engine():
+    """The process pool once per symbol, models of workers not counted."""
+    import parallel
+
+    def solve(knowledge, symbols):
+        entailed = [s for s in symbols if parallel.model_check(knowledge, s)]
+        return entailed, None
+    return solve
+
+
+ENGINES = {
+    "enumerate": enumerate_engine,
+    "knowledge_base": knowledge_base_engine,
+    "sat": sat_engine,
+    "vectorized": vectorized_engine,
+    "parallel": parallel_engine,
+}
+
+
+def main():
+    if len(sys.argv) > 4:
+        sys.exit("Usage: python benchmark.py [engine] [characters] [output]")
+    engine = sys.argv[1] if len(sys.argv) >= 2 else "sat"
+    characters = int(sys.argv[2]) if len(sys.argv) >= 3 else CHARACTERS
+    if engine not in ENGINES:
+        sys.exit(f"Unknown engine, choose one of: {', '.join(ENGINES)}")
+
+    results = benchmark(ENGINES[engine](), characters)
+    results["engine"] = engine
+
+    if len(sys.argv) == 4:
+        with open(sys.argv[3], "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+def benchmark(solve, characters):
+    """
+    Solves PUZZLES puzzles for every number of characters up to
+    characters and collects the measurements.
+    """
+    sizes = []
+    for count in range(1, characters + 1):
+        puzzles = []
+        for seed in range(PUZZLES):
+            knowledge, symbols, _, roles = random_puzzle(
+                count, STATEMENTS * count, seed)
+
+            start = time.perf_counter()
+            entailed, visited = solve(knowledge, symbols)
+            seconds = time.perf_counter() - start
+
+            puzzles.append({
+                "seed": seed,
+                "seconds": seconds,
+                "visited": visited,
+                # characters whose role follows from the statements
+                "solved": sum(symbol in entailed for symbol in symbols),
+                "roles": roles,
+            })
+
+        times = [puzzle["seconds"] for puzzle in puzzles]
+        visits = [puzzle["visited"] for puzzle in puzzles]
+        sizes.append({
+            "characters": count,
+            "symbols": 2 * count,
+            "statements": STATEMENTS * count,
+            "seconds": sum(times) / len(times),
+            "visited": (None if None in visits
+                        else sum(visits) / len(visits)),
+            "puzzles": puzzles,
+        })
+    return {"puzzles_per_size": PUZZLES, "results": sizes}
+
+
+if __name__ == "__main__":
+    main()
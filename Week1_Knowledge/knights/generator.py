@@ -0,0 +1,104 @@
+"""
+Random Knights and Knaves puzzles
+
+Every character is either a knight, who always tells the truth, or a
+knave, who always lies. A puzzle starts from hidden roles and adds
+random statements that are true exactly when their speaker is a knight,
+so every generated puzzle has at least one solution.
+"""
+
+import random
+import sys
+from string import ascii_uppercase
+
+from logic import And, Or, Not, Implication, Biconditional, Symbol
+
+
+def character_names(count):
+    """
+    Returns count names, A to Z then A2 to Z2 and so on.
+    """
+    return [ascii_uppercase[i % 26] + (str(i // 26 + 1) if i >= 26 else "")
+            for i in range(count)]
+
+
+def random_claim(rng, characters, knight, knave):
+    """
+    Returns the text and the sentence of a random claim
+    about one or two of the characters.
+    """
+    x = rng.choice(characters)
+    y = rng.choice([c for c in characters if c != x] or [x])
+    kind = rng.randrange(5)
+    if kind == 0:
+        return f"{x} is a knight", knight[x]
+    elif kind == 1:
+        return f"{x} is a knave", knave[x]
+    elif kind == 2:
+        return f"{x} and {y} are both knaves", And(knave[x], knave[y])
+    elif kind == 3:
+        return f"{x} or {y} is a knight", Or(knight[x], knight[y])
+    else:
+        return (f"{x} and {y} are the same kind",
+                Biconditional(knight[x], knight[y]))
+
+
+def random_puzzle(characters, statements, seed=None):
+    """
+    Returns a random puzzle with the given number of characters and
+    statements as (knowledge, symbols, lines, roles): the knowledge
+    base, the knight and knave symbol of every character, the
+    statements as text and the hidden role of every character.
+    """
+    rng = random.Random(seed)
+    names = character_names(characters)
+    knight = {name: Symbol(f"{name} is a Knight") for name in names}
+    knave = {name: Symbol(f"{name} is a Knave") for name in names}
+    roles = {name: rng.choice(["knight", "knave"]) for name in names}
+    model = {}
+    for name in names:
+        model[knight[name].name] = roles[name] == "knight"
+        model[knave[name].name] = roles[name] == "knave"
+
+    # a character can be a Knight or a Knave, but not both
+    knowledge = And(*[
+        And(Or(knight[name], knave[name]),
+            Not(And(knight[name], knave[name])))
+        for name in names
+    ])
+
+    lines = []
+    for _ in range(statements):
+        speaker = rng.choice(names)
+        text, claim = random_claim(rng, names, knight, knave)
+
+        # knights only say true things and knaves only false ones
+        if claim.evaluate(model) != (roles[speaker] == "knight"):
+            text, claim = f"it is not true that {text}", Not(claim)
+        lines.append(f'{speaker} says "{text[0].upper()}{text[1:]}."')
+
+        knowledge.add(Implication(knight[speaker], claim))
+        knowledge.add(Implication(knave[speaker], Not(claim)))
+
+    symbols = [symbol for name in names
+               for symbol in (knight[name], knave[name])]
+    return knowledge, symbols, lines, roles
+
+
+def main():
+    if len(sys.argv) not in [3, 4]:
+        sys.exit("Usage: python generator.py characters statements [seed]")
+    characters = int(sys.argv[1])
+    statements = int(sys.argv[2])
+    seed = int(sys.argv[3]) if len(sys.argv) == 4 else None
+
+    _, _, lines, roles = random_puzzle(characters, statements, seed)
+    for line in lines:
+        print(line)
+    print()
+    for name, role in roles.items():
+        print(f"    {name} is a {role}")
+
+
+if __name__ == "__main__":
+    main()
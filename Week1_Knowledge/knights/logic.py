@@ -1,8 +1,43 @@
 import itertools
+import weakref
+
+# The shared sentence of every structure used as an operand so far,
+# by class and operands, held only as long as something refers to it
+interned = weakref.WeakValueDictionary()
+
+# Models evaluated by model_check and KnowledgeBase, for benchmarks
+models_checked = 0
+
+
+def intern(sentence):
+    """
+    Returns the shared sentence equal to sentence, building it from the
+    operands if there is none yet. Operands are interned when a sentence
+    is built, so equal subtrees are a single object, and the caller's
+    own sentence never becomes the shared one, so And.add on it can't
+    change the sentences that use it as an operand.
+    """
+    Sentence.validate(sentence)
+    if sentence._shared:
+        return sentence
+    key = (type(sentence), sentence.arguments())
+    shared = interned.get(key)
+    if shared is None:
+        shared = type(sentence)(*key[1])
+        shared._shared = True
+        interned[key] = shared
+    return shared
 
 
 class Sentence():
 
+    # True for the interned copies, which must never change
+    _shared = False
+
+    # caches of the sentence, filled on first use
+    _hash = None
+    _symbols = None
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
@@ -13,7 +48,41 @@ class Sentence():
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        return set(self.symbol_set())
+
+    def arguments(self):
+        """Returns the operands the sentence was built from."""
+        return ()
+
+    def symbol_set(self):
+        """Returns the symbols of the sentence as a cached frozenset."""
+        if self._symbols is None:
+            self._symbols = self.find_symbols()
+        return self._symbols
+
+    def find_symbols(self):
+        """Collects the symbols from the operands."""
+        return frozenset()
+
+    def emit(self, program):
+        """Adds the code computing the sentence to a Program,
+        returns the expression holding its value."""
+        raise Exception("nothing to compile")
+
+    def compile(self, symbols=None):
+        """
+        Compiles the sentence into a flat Python function of a sequence
+        of values, one per symbol in the order of symbols (sorted names
+        by default), returning the truth value of the sentence.
+
+        The function uses bitwise operators only, so the values can be
+        bools, 0 and 1, or whole columns of models at once, like bit
+        masks or boolean arrays, given true as the all true column.
+        """
+        if symbols is None:
+            symbols = sorted(self.symbols())
+        program = Program(symbols)
+        return program.function(program.value(self))
 
     @classmethod
     def validate(cls, sentence):
@@ -48,10 +117,19 @@ class Symbol(Sentence):
         self.name = name
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (isinstance(other, Symbol)
+                                 and self.name == other.name)
 
     def __hash__(self):
-        return hash(("symbol", self.name))
+        if self._hash is None:
+            self._hash = hash(("symbol", self.name))
+        return self._hash
+
+    def arguments(self):
+        return (self.name,)
+
+    def __reduce__(self):
+        return (Symbol, self.arguments())
 
     def __repr__(self):
         return self.name
@@ -65,20 +143,34 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def find_symbols(self):
+        return frozenset([self.name])
+
+    def emit(self, program):
+        try:
+            return f"x{program.index[self.name]}"
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
 
 
 class Not(Sentence):
     def __init__(self, operand):
-        Sentence.validate(operand)
-        self.operand = operand
+        self.operand = intern(operand)
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (isinstance(other, Not)
+                                 and self.operand == other.operand)
 
     def __hash__(self):
-        return hash(("not", hash(self.operand)))
+        if self._hash is None:
+            self._hash = hash(("not", hash(self.operand)))
+        return self._hash
+
+    def arguments(self):
+        return (self.operand,)
+
+    def __reduce__(self):
+        return (Not, self.arguments())
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -89,23 +181,33 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def find_symbols(self):
+        return self.operand.symbol_set()
+
+    def emit(self, program):
+        return program.assign(f"t ^ {program.value(self.operand)}")
 
 
 class And(Sentence):
     def __init__(self, *conjuncts):
-        for conjunct in conjuncts:
-            Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
+        self.conjuncts = [intern(conjunct) for conjunct in conjuncts]
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (isinstance(other, And)
+                                 and self.conjuncts == other.conjuncts)
 
     def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+        if self._hash is None:
+            self._hash = hash(
+                ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+            )
+        return self._hash
+
+    def arguments(self):
+        return tuple(self.conjuncts)
+
+    def __reduce__(self):
+        return (And, self.arguments())
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -114,8 +216,16 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
-        Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+        """
+        Adds a conjunct in place. Only the caller's own sentences can
+        grow, sentences holding this one as an operand hold a shared
+        copy of it and don't change.
+        """
+        if self._shared:
+            raise TypeError("shared sentences can't be changed")
+        self.conjuncts.append(intern(conjunct))
+        self._hash = None
+        self._symbols = None
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -126,23 +236,39 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def find_symbols(self):
+        return frozenset().union(
+            *[conjunct.symbol_set() for conjunct in self.conjuncts]
+        )
+
+    def emit(self, program):
+        if not self.conjuncts:
+            return "t"
+        return program.assign(" & ".join(
+            [program.value(conjunct) for conjunct in self.conjuncts]
+        ))
 
 
 class Or(Sentence):
     def __init__(self, *disjuncts):
-        for disjunct in disjuncts:
-            Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+        self.disjuncts = [intern(disjunct) for disjunct in disjuncts]
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return self is other or (isinstance(other, Or)
+                                 and self.disjuncts == other.disjuncts)
 
     def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+        if self._hash is None:
+            self._hash = hash(
+                ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
+            )
+        return self._hash
+
+    def arguments(self):
+        return tuple(self.disjuncts)
+
+    def __reduce__(self):
+        return (Or, self.arguments())
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -157,24 +283,41 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def find_symbols(self):
+        return frozenset().union(
+            *[disjunct.symbol_set() for disjunct in self.disjuncts]
+        )
+
+    def emit(self, program):
+        if not self.disjuncts:
+            return program.assign("t ^ t")
+        return program.assign(" | ".join(
+            [program.value(disjunct) for disjunct in self.disjuncts]
+        ))
 
 
 class Implication(Sentence):
     def __init__(self, antecedent, consequent):
-        Sentence.validate(antecedent)
-        Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
+        self.antecedent = intern(antecedent)
+        self.consequent = intern(consequent)
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (isinstance(other, Implication)
+                                 and self.antecedent == other.antecedent
+                                 and self.consequent == other.consequent)
 
     def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        if self._hash is None:
+            self._hash = hash(
+                ("implies", hash(self.antecedent), hash(self.consequent))
+            )
+        return self._hash
+
+    def arguments(self):
+        return (self.antecedent, self.consequent)
+
+    def __reduce__(self):
+        return (Implication, self.arguments())
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -188,76 +331,287 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def find_symbols(self):
+        return self.antecedent.symbol_set() | self.consequent.symbol_set()
+
+    def emit(self, program):
+        antecedent = program.value(self.antecedent)
+        consequent = program.value(self.consequent)
+        return program.assign(f"(t ^ {antecedent}) | {consequent}")
 
 
 class Biconditional(Sentence):
     def __init__(self, left, right):
-        Sentence.validate(left)
-        Sentence.validate(right)
-        self.left = left
-        self.right = right
+        self.left = intern(left)
+        self.right = intern(right)
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (isinstance(other, Biconditional)
+                                 and self.left == other.left
+                                 and self.right == other.right)
 
     def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        if self._hash is None:
+            self._hash = hash(
+                ("biconditional", hash(self.left), hash(self.right))
+            )
+        return self._hash
+
+    def arguments(self):
+        return (self.left, self.right)
+
+    def __reduce__(self):
+        return (Biconditional, self.arguments())
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
     def evaluate(self, model):
-        return ((self.left.evaluate(model)
-                 and self.right.evaluate(model))
-                or (not self.left.evaluate(model)
-                    and not self.right.evaluate(model)))
+        return self.left.evaluate(model) == self.right.evaluate(model)
 
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
-
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
-
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
-
-        # If model has an assignment for each symbol
-        if not symbols:
-
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
+    def find_symbols(self):
+        return self.left.symbol_set() | self.right.symbol_set()
+
+    def emit(self, program):
+        left = program.value(self.left)
+        right = program.value(self.right)
+        return program.assign(f"t ^ {left} ^ {right}")
+
+
+class Program():
+    """
+    Straight-line code computing sentences over symbols x0, x1, ...,
+    one local variable per distinct subformula.
+    """
+
+    def __init__(self, symbols):
+        self.symbols = list(symbols)
+        self.index = {name: i for i, name in enumerate(self.symbols)}
+        self.lines = []
+        # expression holding the value of every sentence emitted so far
+        self.values = {}
+
+    def value(self, sentence):
+        """Returns the expression holding the value of sentence,
+        emitting its code the first time it is seen."""
+        if sentence not in self.values:
+            self.values[sentence] = sentence.emit(self)
+        return self.values[sentence]
+
+    def assign(self, expression):
+        """Adds a line computing expression into a new local variable."""
+        name = f"s{len(self.lines)}"
+        self.lines.append(f"    {name} = {expression}")
+        return name
+
+    def function(self, result):
+        """Returns the function computing result from the values."""
+        lines = ["def evaluate(values, t=True):"]
+        if self.symbols:
+            names = ", ".join(f"x{i}" for i in range(len(self.symbols)))
+            lines.append(f"    {names}, = values")
+        lines.extend(self.lines)
+        lines.append(f"    return {result}")
+        namespace = {}
+        exec(compile("\n".join(lines), "<sentence>", "exec"), namespace)
+        return namespace["evaluate"]
+
+
+def simplify(sentence):
+    """
+    Returns a sentence equivalent to sentence with nested conjunctions
+    and disjunctions flattened, duplicate operands and tautologies
+    removed and constants folded. The empty And() stands for true and
+    the empty Or() for false.
+    """
+    simplified = {}
+
+    def is_true(s):
+        return isinstance(s, And) and not s.conjuncts
+
+    def is_false(s):
+        return isinstance(s, Or) and not s.disjuncts
+
+    def negate(s):
+        if is_true(s):
+            return Or()
+        if is_false(s):
+            return And()
+        if isinstance(s, Not):
+            return s.operand
+        return Not(s)
+
+    def operands(cls, parts):
+        """
+        Flattens the simplified parts of an And or Or, returns None
+        if one of them, or a part and its negation, decide it.
+        """
+        flat = {}
+        for part in parts:
+            if isinstance(part, cls):
+                flat.update(dict.fromkeys(part.arguments()))
+            else:
+                flat[part] = None
+        decided = is_false if cls is And else is_true
+        neutral = is_true if cls is And else is_false
+        kept = []
+        for part in flat:
+            if decided(part) or (isinstance(part, Not)
+                                 and part.operand in flat):
+                return None
+            if not neutral(part):
+                kept.append(part)
+        return kept
+
+    def walk(s):
+        if s in simplified:
+            return simplified[s]
+
+        if isinstance(s, Not):
+            result = negate(walk(s.operand))
+        elif isinstance(s, And) or isinstance(s, Or):
+            cls = type(s)
+            parts = operands(cls, [walk(part) for part in s.arguments()])
+            if parts is None:
+                result = Or() if cls is And else And()
+            elif len(parts) == 1:
+                result = parts[0]
+            else:
+                result = cls(*parts)
+        elif isinstance(s, Implication):
+            # a => b is not a or b
+            result = walk(Or(negate(walk(s.antecedent)),
+                             walk(s.consequent)))
+            if isinstance(result, Or) and len(result.disjuncts) == 2:
+                antecedent, consequent = result.disjuncts
+                result = Implication(negate(antecedent), consequent)
+        elif isinstance(s, Biconditional):
+            left = walk(s.left)
+            right = walk(s.right)
+            if left == right:
+                result = And()
+            elif left == negate(right):
+                result = Or()
+            elif is_true(left) or is_false(left):
+                result = right if is_true(left) else negate(right)
+            elif is_true(right) or is_false(right):
+                result = left if is_true(right) else negate(left)
+            else:
+                result = Biconditional(left, right)
         else:
+            result = s
 
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
-
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
-
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
+        simplified[s] = result
+        return result
 
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
+    return walk(sentence)
 
-    # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
 
-    # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+def model_check(knowledge, query):
+    """Checks if knowledge base entails query."""
+    global models_checked
+
+    # A model where knowledge is true and query false is a counterexample,
+    # only the symbols left in it once simplified need to be enumerated
+    sentence = simplify(And(knowledge, Not(query)))
+    symbols = sorted(sentence.symbols())
+    counterexample = sentence.compile(symbols)
+
+    # Check every model, as a tuple of values in the order of symbols
+    models = itertools.product((False, True), repeat=len(symbols))
+    found = next(filter(counterexample, models), None)
+    if found is None:
+        models_checked += 2 ** len(symbols)
+        return True
+
+    # models come in binary counting order, the first symbol highest
+    models_checked += 1 + sum(value << i
+                              for i, value in enumerate(reversed(found)))
+    return False
+
+
+class KnowledgeBase():
+    """
+    Knowledge that grows one sentence at a time and keeps the models
+    it is true in, so many queries are answered without enumerating
+    the models again.
+
+    A model is a tuple of values in the order of self.symbols. Every
+    added sentence extends the models with its new symbols and drops
+    the models it is false in, conjunctions are added one conjunct
+    at a time so the models are filtered as early as possible.
+    """
+
+    def __init__(self, *sentences):
+        self.symbols = []
+        self.models = [()]
+        for sentence in sentences:
+            self.add(sentence)
+
+    def add(self, sentence):
+        """Adds a sentence to the knowledge base."""
+        Sentence.validate(sentence)
+        sentence = simplify(sentence)
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+            return
+
+        # every model takes every value of the symbols not seen before
+        new = sorted(sentence.symbol_set().difference(self.symbols))
+        if new:
+            self.symbols.extend(new)
+            values = list(itertools.product((False, True), repeat=len(new)))
+            self.models = [model + value
+                           for model in self.models for value in values]
+
+        global models_checked
+        models_checked += len(self.models)
+        holds = sentence.compile(self.symbols)
+        self.models = [model for model in self.models if holds(model)]
+
+    def satisfiable(self):
+        """Checks if the knowledge base is true in some model."""
+        return bool(self.models)
+
+    def entails(self, query):
+        """Checks if knowledge base entails query."""
+
+        # symbols the knowledge doesn't mention can take any value
+        new = sorted(query.symbol_set().difference(self.symbols))
+        holds = query.compile(self.symbols + new)
+        values = list(itertools.product((False, True), repeat=len(new)))
+        return all(holds(model + value)
+                   for model in self.models for value in values)
+
+    def entailed_literals(self, symbols=None):
+        """
+        Returns every literal over symbols (all the symbols of the
+        knowledge base by default) the knowledge base entails,
+        a Symbol for a symbol true in every model and a Not of it
+        for a symbol false in every model, in one pass over the models.
+        """
+        if symbols is None:
+            symbols = [Symbol(name) for name in self.symbols]
+        columns = dict(zip(self.symbols, zip(*self.models)))
+
+        literals = []
+        for symbol in symbols:
+            if symbol.name not in self.symbols:
+                # true in some models and false in others, unless
+                # there are no models and everything is entailed
+                if self.models:
+                    continue
+                column = ()
+            else:
+                column = columns.get(symbol.name, ())
+            if all(column):
+                literals.append(symbol)
+            if not any(column):
+                literals.append(Not(symbol))
+        return literals
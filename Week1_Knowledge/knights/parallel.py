@@ -0,0 +1,72 @@
+"""
+Parallel model checking
+
+The models are split by fixing the values of the first few symbols,
+every assignment of that prefix is one task for a process pool and
+enumerates the models of the remaining symbols. A flag shared by the
+workers stops all of them as soon as one finds a counterexample.
+"""
+
+import itertools
+from multiprocessing import Event, Pool
+
+from logic import And, Not, simplify
+
+# Number of symbols fixed per task, at most 2^PREFIX_BITS tasks
+PREFIX_BITS = 6
+
+# Models a worker checks between two looks at the shared flag
+BATCH_SIZE = 4096
+
+# Compiled counterexample test and symbol count of the worker process
+counterexample = None
+symbol_count = 0
+
+# Set by the first worker that finds a counterexample
+found = None
+
+
+def init_worker(sentence, symbols, event):
+    global counterexample, symbol_count, found
+    counterexample = sentence.compile(symbols)
+    symbol_count = len(symbols)
+    found = event
+
+
+def check_prefix(prefix):
+    """
+    Checks every model starting with the values of prefix,
+    returns False if one of them is a counterexample or
+    another worker has found one already.
+    """
+    rest = itertools.product((False, True),
+                             repeat=symbol_count - len(prefix))
+    models = (prefix + values for values in rest)
+    while not found.is_set():
+        batch = list(itertools.islice(models, BATCH_SIZE))
+        if not batch:
+            return True
+        if any(map(counterexample, batch)):
+            found.set()
+            return False
+    return False
+
+
+def model_check(knowledge, query, processes=None, prefix_bits=PREFIX_BITS):
+    """Checks if knowledge base entails query, on processes workers."""
+
+    # A model where knowledge is true and query false is a counterexample,
+    # only the symbols left in it once simplified need to be enumerated
+    sentence = simplify(And(knowledge, Not(query)))
+    symbols = sorted(sentence.symbols())
+    prefixes = itertools.product((False, True),
+                                 repeat=min(prefix_bits, len(symbols)))
+
+    found = Event()
+    with Pool(processes, initializer=init_worker,
+              initargs=(sentence, symbols, found)) as pool:
+        # every task still runs to the end, once the flag is set the
+        # remaining ones return at once; leaving the pool with tasks
+        # queued could block its terminate on the task queue lock
+        results = list(pool.imap_unordered(check_prefix, prefixes))
+    return all(results)
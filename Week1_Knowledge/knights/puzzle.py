@@ -93,8 +93,10 @@ def main():
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
+            # every entailed literal from one pass over the models
+            entailed = KnowledgeBase(knowledge).entailed_literals(symbols)
             for symbol in symbols:
-                if model_check(knowledge, symbol):
+                if symbol in entailed:
                     print(f"    {symbol}")
 
 
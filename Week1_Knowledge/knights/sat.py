@@ -0,0 +1,253 @@
+"""
+Satisfiability backend for logical sentences
+
+Sentences are turned into clauses in conjunctive normal form with the
+Tseitin transform, one new variable per subformula so the clauses only
+grow linearly, and a DPLL solver with unit propagation over two watched
+literals per clause decides whether the clauses can be satisfied.
+
+A knowledge base entails a query exactly when knowledge and the negated
+query can't be satisfied together, so model_check never enumerates
+the 2^n models.
+"""
+
+from logic import Symbol, Not, And, Or, Implication, Biconditional
+
+# Counted by every solve, for comparing with model enumeration
+decisions = 0
+propagations = 0
+
+
+class CNF():
+    """
+    Clauses over integer variables numbered from 1, a literal
+    being v for variable v true and -v for variable v false.
+    """
+
+    def __init__(self):
+        # variable of every symbol name
+        self.variables = {}
+        # literal standing for every subformula converted so far
+        self.literals = {}
+        self.count = 0
+        self.clauses = []
+
+    def new_variable(self):
+        self.count += 1
+        return self.count
+
+    def variable(self, name):
+        """
+        Returns the variable of a symbol, numbering new symbols.
+        """
+        if name not in self.variables:
+            self.variables[name] = self.new_variable()
+        return self.variables[name]
+
+    def add(self, sentence):
+        """
+        Adds clauses that hold exactly when sentence is true.
+        """
+
+        # top level conjunctions and disjunctions need no new variables
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append(
+                [self.literal(disjunct) for disjunct in sentence.disjuncts]
+            )
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """
+        Returns a literal that is true exactly when sentence is true,
+        adding the clauses that define it.
+        """
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        if isinstance(sentence, And):
+            parts = [self.literal(c) for c in sentence.conjuncts]
+            x = self.new_variable()
+            # x => every part, all parts => x
+            for part in parts:
+                self.clauses.append([-x, part])
+            self.clauses.append([x] + [-part for part in parts])
+        elif isinstance(sentence, Or):
+            parts = [self.literal(d) for d in sentence.disjuncts]
+            x = self.new_variable()
+            # x => some part, any part => x
+            self.clauses.append([-x] + parts)
+            for part in parts:
+                self.clauses.append([x, -part])
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            b = self.literal(sentence.consequent)
+            x = self.new_variable()
+            # x <=> (not a or b)
+            self.clauses.append([-x, -a, b])
+            self.clauses.append([x, a])
+            self.clauses.append([x, -b])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            x = self.new_variable()
+            # x <=> (a <=> b)
+            self.clauses.append([-x, -a, b])
+            self.clauses.append([-x, a, -b])
+            self.clauses.append([x, a, b])
+            self.clauses.append([x, -a, -b])
+        else:
+            raise TypeError("must be a logical sentence")
+
+        self.literals[sentence] = x
+        return x
+
+
+def solve(clauses, count):
+    """
+    Returns a satisfying assignment of the clauses over variables
+    1 to count as a list indexed by variable, None if there is none.
+    """
+    global decisions, propagations
+
+    # value[v] is 1 or -1 once variable v is assigned, 0 before
+    value = [0] * (count + 1)
+    trail = []
+
+    def assign(literal):
+        value[abs(literal)] = 1 if literal > 0 else -1
+        trail.append(literal)
+
+    def literal_value(literal):
+        return value[literal] if literal > 0 else -value[-literal]
+
+    # every clause watches its first two literals, watches[literal]
+    # lists the clauses to look at again when literal becomes false
+    watches = {}
+    units = []
+    problem = []
+    for clause in clauses:
+        clause = list(dict.fromkeys(clause))
+        if not clause:
+            return None
+        if any(-literal in clause for literal in clause):
+            # always true, nothing to watch
+            continue
+        if len(clause) == 1:
+            units.append(clause[0])
+            continue
+        problem.append(clause)
+        watches.setdefault(clause[0], []).append(clause)
+        watches.setdefault(clause[1], []).append(clause)
+
+    for literal in units:
+        current = literal_value(literal)
+        if current < 0:
+            return None
+        if current == 0:
+            assign(literal)
+
+    def propagate(start):
+        """
+        Assigns every literal forced by the trail from start on,
+        returns False on a conflict.
+        """
+        global propagations
+        i = start
+        while i < len(trail):
+            false_literal = -trail[i]
+            i += 1
+            watching = watches.get(false_literal, [])
+            kept = []
+            for j, clause in enumerate(watching):
+                # keep the false literal in the second watch
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                other = clause[0]
+                if literal_value(other) > 0:
+                    kept.append(clause)
+                    continue
+
+                # watch another literal that is not false yet
+                for k in range(2, len(clause)):
+                    if literal_value(clause[k]) >= 0:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        watches.setdefault(clause[1], []).append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if literal_value(other) < 0:
+                        kept.extend(watching[j + 1:])
+                        watches[false_literal] = kept
+                        return False
+                    propagations += 1
+                    assign(other)
+            watches[false_literal] = kept
+        return True
+
+    # branch on the variables in the most clauses first
+    occurrences = [0] * (count + 1)
+    for clause in problem:
+        for literal in clause:
+            occurrences[abs(literal)] += 1
+    order = sorted(range(1, count + 1), key=lambda v: -occurrences[v])
+    rank = [0] * (count + 1)
+    for position, v in enumerate(order):
+        rank[v] = position
+
+    # decisions taken: (trail length before it, literal, flipped already)
+    stack = []
+    if not propagate(0):
+        return None
+    position = 0
+    while True:
+        while position < count and value[order[position]] != 0:
+            position += 1
+        if position == count:
+            return value
+
+        decisions += 1
+        literal = -order[position]
+        stack.append((len(trail), literal, False))
+        assign(literal)
+
+        while not propagate(len(trail) - 1):
+            # undo up to the last decision that wasn't flipped yet
+            # and try the other value of its variable
+            while stack and stack[-1][2]:
+                stack.pop()
+            if not stack:
+                return None
+            size, literal, _ = stack.pop()
+            for undone in trail[size:]:
+                value[abs(undone)] = 0
+            del trail[size:]
+            # everything undone comes after the flipped variable in order
+            position = rank[abs(literal)]
+            stack.append((size, -literal, True))
+            assign(-literal)
+
+
+def satisfiable(sentence):
+    """
+    Returns a model of sentence as a dictionary mapping symbol names
+    to truth values, None if no model exists.
+    """
+    cnf = CNF()
+    cnf.add(sentence)
+    value = solve(cnf.clauses, cnf.count)
+    if value is None:
+        return None
+    return {name: value[v] > 0 for name, v in cnf.variables.items()}
+
+
+def model_check(knowledge, query):
+    """Checks if knowledge base entails query."""
+    return satisfiable(And(knowledge, Not(query))) is None
@@ -0,0 +1,45 @@
+import unittest
+
+from logic import *
+
+
+class InternTest(unittest.TestCase):
+
+    def setUp(self):
+        self.A = Symbol("A")
+        self.B = Symbol("B")
+        self.C = Symbol("C")
+        self.D = Symbol("D")
+
+    def test_equal_subtrees_are_shared(self):
+        first = Or(And(self.A, self.B), self.C)
+        second = Not(And(self.A, self.B))
+        self.assertIs(first.disjuncts[0], second.operand)
+
+    def test_add_leaves_other_sentences_unchanged(self):
+        kb = And(self.A, self.B)
+        Not(kb)
+        other = Or(And(self.A, self.B), self.D)
+        kb.add(self.C)
+        self.assertEqual(other, Or(And(self.A, self.B), self.D))
+        self.assertEqual(other.symbols(), {"A", "B", "D"})
+
+    def test_add_leaves_parent_caches_valid(self):
+        kb = And(self.A, self.B)
+        outer = Not(kb)
+        outer.symbols()
+        hash(outer)
+        kb.add(self.D)
+        self.assertEqual(outer.symbols(), {"A", "B"})
+        self.assertEqual(hash(outer), hash(Not(And(self.A, self.B))))
+        self.assertFalse(model_check(outer, self.A))
+        self.assertEqual(kb.symbols(), {"A", "B", "D"})
+
+    def test_shared_sentences_cannot_grow(self):
+        outer = Not(And(self.A, self.B))
+        with self.assertRaises(TypeError):
+            outer.operand.add(self.C)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+Vectorized truth tables for logical sentences
+
+A compiled sentence is evaluated on a whole block of models at once,
+each symbol being a NumPy boolean array with its value in every model
+of the block. Model m gives symbol i the value of bit i of m, the
+low symbols vary inside a block and the high ones are fixed per block,
+so only one block of 2^k models is in memory at a time.
+"""
+
+import numpy as np
+
+from logic import And, Not, simplify
+
+# Number of symbols varying inside a block, a block holds 2^CHUNK_BITS
+# models and the compiled code keeps one array per subformula
+CHUNK_BITS = 14
+
+# Models evaluated by model_check, for benchmarks
+models_checked = 0
+
+
+def columns(count):
+    """
+    Returns the values of the first count symbols
+    over all 2^count models, one boolean array per symbol.
+    """
+    models = np.arange(1 << count)
+    return [(models >> i & 1).astype(bool) for i in range(count)]
+
+
+def truth_table(sentence, symbols=None, chunk_bits=CHUNK_BITS):
+    """
+    Yields the value of sentence in every model, as boolean arrays
+    of consecutive blocks of at most 2^chunk_bits models.
+    """
+    if symbols is None:
+        symbols = sorted(sentence.symbols())
+    evaluate = sentence.compile(symbols)
+
+    low = min(len(symbols), chunk_bits)
+    low_columns = columns(low)
+    for block in range(1 << (len(symbols) - low)):
+        high_values = [bool(block >> i & 1)
+                       for i in range(len(symbols) - low)]
+
+        # a sentence of the high symbols alone comes out as a scalar
+        yield np.broadcast_to(evaluate(low_columns + high_values, True),
+                              (1 << low,))
+
+
+def model_check(knowledge, query, chunk_bits=CHUNK_BITS):
+    """Checks if knowledge base entails query."""
+    global models_checked
+
+    # a model where knowledge is true and query false is a counterexample
+    counterexample = simplify(And(knowledge, Not(query)))
+    for block in truth_table(counterexample, chunk_bits=chunk_bits):
+        models_checked += len(block)
+        if block.any():
+            return False
+    return True
@@ -1,6 +1,5 @@
 import itertools
 import random
-import copy
 
 
 class Minesweeper():
@@ -179,14 +178,63 @@ class MinesweeperAI():
         # List of sentences about the game known to be true
         self.knowledge = []
 
+        # The same sentences by their (cells, count) key,
+        # so inferred duplicates are dropped
+        self.sentences = {}
+
+        # Keys of the sentences each cell appears in
+        self.cell_sentences = {}
+
+        # Keys of the sentences added or changed since inference last ran
+        self.pending = set()
+
+    @staticmethod
+    def sentence_key(sentence):
+        """
+        Returns the key a sentence is stored by in the knowledge base.
+        """
+        return frozenset(sentence.cells), sentence.count
+
+    def add_sentence(self, sentence):
+        """
+        Adds a sentence to the knowledge base, unless it is empty
+        or already known, and queues it for inference.
+        """
+        key = self.sentence_key(sentence)
+        if not sentence.cells or key in self.sentences:
+            return
+        self.sentences[key] = sentence
+        self.knowledge.append(sentence)
+        for cell in sentence.cells:
+            self.cell_sentences.setdefault(cell, set()).add(key)
+        self.pending.add(key)
+
+    def remove_sentence(self, key):
+        """
+        Removes a sentence from the knowledge base and the cell index,
+        returns the sentence.
+        """
+        sentence = self.sentences.pop(key)
+        self.knowledge.remove(sentence)
+        for cell in key[0]:
+            self.cell_sentences[cell].discard(key)
+        self.pending.discard(key)
+        return sentence
+
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
+
+        # only the sentences containing the cell change,
+        # they are stored again under their new key
+        for key in list(self.cell_sentences.get(cell, ())):
+            sentence = self.remove_sentence(key)
             sentence.mark_mine(cell)
+            self.add_sentence(sentence)
+        self.cell_sentences.pop(cell, None)
 
     def mark_safe(self, cell):
         """
@@ -194,8 +242,11 @@ class MinesweeperAI():
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
+        for key in list(self.cell_sentences.get(cell, ())):
+            sentence = self.remove_sentence(key)
             sentence.mark_safe(cell)
+            self.add_sentence(sentence)
+        self.cell_sentences.pop(cell, None)
 
 
     def neighbour_cells(self, cell):
@@ -247,108 +298,61 @@ class MinesweeperAI():
         self.mark_safe(cell)
 
         # add a new sentence to the AI's knowledge base
-        # based on the value of `cell` and `count`
+        # based on the value of `cell` and `count`:
+        # for each neighbour, check if we already know it is a mine cell
+        # or a safe cell, if true, don't add it to the new sentence
+        # and take the known mines off the count
         new_sentence = set()
-        new_count = copy.deepcopy(count)
+        new_count = count
 
         neighbours, count_neighbours = self.neighbour_cells(cell)
-
-        # if the count is 0 
-        # mark all neighbours as safe
-        if new_count == 0:
-            for neighbour in neighbours:
-                if neighbour not in self.safes:
-                    self.mark_safe(neighbour)
-
-        # if the count = the total number of neighbours
-        # it means all of them are mines 
-        # mark all neighbours as mines
-        elif new_count == count_neighbours:
-            for neighbour in neighbours:
-                if neighbour not in self.mines:
-                    self.mark_mine(neighbour)
-        else:
-            # otherwise, for each neighbour:
-            # check if we already know it is a mine cell or a safe cell
-            # if true, don't add it to the new sentence for the knowledge base
-            # otherwise, add it 
-            for neighbour in neighbours:
-                if neighbour not in self.mines and neighbour not in self.safes:
-                    new_sentence.add(neighbour)
-                elif neighbour in self.mines:
-                    new_count -= 1
-            self.knowledge.append(Sentence(new_sentence, new_count))
-
-        # make inferrences from the AI's knowledge base
-        # mark any additional cells as safe or as mines
-        get_all_known_safes = set()
-        get_all_known_mines = set()
-        to_remove = []
-        to_add = []
+        for neighbour in neighbours:
+            if neighbour in self.mines:
+                new_count -= 1
+            elif neighbour not in self.safes:
+                new_sentence.add(neighbour)
+        self.add_sentence(Sentence(new_sentence, new_count))
 
         # Basic idea:
-        # for each sentence in the AI's knowledge base
-        # if the sentence became safe(or all mines) after changes were made to it 
-        # we can mark all cells from the sentence as safe(or mines) 
-        # and remove them from other sentences
-        # after we're done, we can remove the sentence itself 
-        # because all relevant info has been transfered to self.safes(or self.mines)
-        for sentence in self.knowledge:
-            # if a sentence is empty
-            # remove it
-            if not sentence.cells:
-                to_remove.append(sentence)
+        # take the sentences added or changed since the last inference
+        # one at a time, until no sentence is left to look at
+        # if the sentence is all safe (or all mines)
+        # we can mark all cells from it as safe (or mines), marking
+        # removes them from the other sentences and queues those
+        # otherwise compare it with the sentences it shares a cell with:
+        # if we know {A, B, C, D, E} = 2 and {D, E} = 1
+        # add a new sentence to the knowledge base:
+        # {A, B, C} must be 1
+        # sentences sharing no cell can't be subsets of each other
+        while self.pending:
+            key = self.pending.pop()
+            sentence = self.sentences[key]
 
             get_known_safes = sentence.known_safes()
-            get_known_mines = sentence.known_mines()
-
-            # if the sentence is evaluated to safe
-            # mark every cell from it as safe
             if get_known_safes:
-                get_all_known_safes = get_all_known_safes.union(get_known_safes)
                 for safe_cell in get_known_safes.copy():
                     self.mark_safe(safe_cell)
-                to_remove.append(sentence)
+                continue
 
-            # if the sentence is evaluated to all mines
-            # mark every cell from it as mine
+            get_known_mines = sentence.known_mines()
             if get_known_mines:
-                get_all_known_mines = get_all_known_mines.union(get_known_mines)
                 for mine_cell in get_known_mines.copy():
                     self.mark_mine(mine_cell)
-                to_remove.append(sentence)
-
-        # update the safe cells and mines that we know about 
-        # after inferences on the AI's knowledge base
-        self.safes = self.safes.union(get_all_known_safes)
-        self.mines = self.mines.union(get_all_known_mines)
-
-        # remove any sentence that we don't need anymore
-        if to_remove:
-            for sentence in to_remove:
-                self.knowledge.remove(sentence)
-
-        # check on the cleaned knowledge base if we can draw some more conclusions 
-        # if we know {A, B, C, D, E} = 2 and {D, E} = 1
-        # add a new sentence to the knowledge base: 
-        # {A, B, C} must be 1
-        loop1 = self.knowledge.copy()
-        loop2 = self.knowledge.copy()
-
-        for i in range(len(loop1)):
-            for j in range(i+1, len(loop2)):
-                if loop1[i].cells.issubset(loop2[j].cells):
-                    new_knowledge = loop2[j].cells.difference(loop1[i].cells)
-                    new_count = loop2[j].count - loop1[i].count
-                    to_add.append(Sentence(new_knowledge, new_count))
-                elif loop2[j].cells.issubset(loop1[i].cells):
-                    new_knowledge = loop1[i].cells.difference(loop2[j].cells)
-                    new_count = loop1[i].count - loop2[j].count
-                    to_add.append(Sentence(new_knowledge, new_count))
-
-        # add new sentences
-        if to_add:
-            self.knowledge.extend(to_add)
+                continue
+
+            cells, count = key
+            others = set()
+            for sentence_cell in cells:
+                others.update(self.cell_sentences[sentence_cell])
+            others.discard(key)
+
+            for other_cells, other_count in others:
+                if cells < other_cells:
+                    self.add_sentence(Sentence(other_cells - cells,
+                                               other_count - count))
+                elif other_cells < cells:
+                    self.add_sentence(Sentence(cells - other_cells,
+                                               count - other_count))
 
 
     def make_safe_move(self):